@@ -8,8 +8,8 @@ with field inference for missing text on credential and select fields.
 from __future__ import annotations
 
 import re
-from typing import TYPE_CHECKING
-from urllib.parse import parse_qs, urlencode, urlsplit, urlunsplit
+from typing import TYPE_CHECKING, Callable
+from urllib.parse import urlsplit, urlunsplit
 
 from models.actions import (
     ActionUnion,
@@ -30,17 +30,75 @@ if TYPE_CHECKING:
     from parsing.candidates import Candidate
 
 
+# What the normalize_url fast path must leave to urlsplit/urlunsplit:
+# netlocs ending at "?"/"#" or needing validation (IPv6 brackets), and
+# tails with an empty query or fragment (dropped) or tab/CR/LF (removed).
+_NETLOC_SLOW_RE = re.compile(r"[?#\[\]\t\r\n]")
+_TAIL_SLOW_RE = re.compile(r"\?#|[?#]\Z|[\t\r\n]")
+
+# Query params that must survive navigation (evaluator bookkeeping).
+_PROPAGATE_KEYS = ("seed", "web_agent_id", "validator_id")
+_SEED_PARAM_RE = re.compile(
+    r"(?:^|&)(" + "|".join(_PROPAGATE_KEYS) + r")(?:=([^&]*))?(?=&|$)"
+)
+
+# Lowercased labels that mark a username/email field.
+_CREDENTIAL_KW_RE = re.compile("user|email")
+
+# Placeholder that already holds a concrete ISO date (e.g. "2024-01-31").
+_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+# Action names grouped by whether they reference a candidate.
+_NO_CANDIDATE_ACTIONS = frozenset({"done", "scroll_down", "scroll_up", "navigate"})
+_CANDIDATE_ACTIONS = frozenset({"click", "type", "select"})
+
+# Characters urlsplit strips from anywhere in a URL.
+_URL_UNSAFE_RE = re.compile(r"[\t\r\n]")
+
+# Labels preferred by the early-step fallback click in build_action.
+_SUBMIT_KW_RE = re.compile("submit|log in|sign in|login|signin")
+
+
 # ---------------------------------------------------------------------------
 # Same-URL detection
 # ---------------------------------------------------------------------------
 
+def _path_and_query(url: str) -> tuple[str, str]:
+    """Return the ``(path, query)`` that ``urlsplit`` would give for *url*.
+
+    Slices the common shapes (absolute paths and lowercase ``http://``,
+    ``https://`` or ``//`` URLs with a plain netloc) without a full URL
+    parse. Anything ``urlsplit`` treats specially -- other or uppercase
+    schemes, relative paths that may carry a scheme, tab/CR/LF, IPv6 or
+    non-ASCII netlocs -- goes through ``urlsplit`` itself.
+    """
+    if _URL_UNSAFE_RE.search(url) or not (
+        url.startswith("/") or url.startswith(("http://", "https://"))
+    ):
+        parts = urlsplit(url)
+        return parts.path, parts.query
+    url = url.partition("#")[0]
+    if not url.startswith("/") or url.startswith("//"):
+        netloc_start = url.find("//") + 2
+        netloc_end = len(url)
+        for sep in "/?":
+            i = url.find(sep, netloc_start)
+            if i != -1 and i < netloc_end:
+                netloc_end = i
+        netloc = url[netloc_start:netloc_end]
+        if not netloc.isascii() or "[" in netloc or "]" in netloc:
+            parts = urlsplit(url)
+            return parts.path, parts.query
+        url = url[netloc_end:]
+    path, _, query = url.partition("?")
+    return path, query
+
+
 def _same_path_query(url_a: str, url_b: str) -> bool:
     """Return True if two URLs have the same path and query (ignoring scheme/host/fragment)."""
     if not url_a or not url_b:
         return False
-    a = urlsplit(url_a)
-    b = urlsplit(url_b)
-    return a.path == b.path and a.query == b.query
+    return _path_and_query(url_a) == _path_and_query(url_b)
 
 
 # ---------------------------------------------------------------------------
@@ -60,8 +118,22 @@ def normalize_url(raw_url: str) -> str:
     if not raw_url.startswith(("http://", "https://", "//")):
         # Relative path -- prepend localhost
         if raw_url.startswith("/"):
-            return f"http://localhost{raw_url}"
-        return f"http://localhost/{raw_url}"
+            return "http://localhost" + raw_url
+        return "http://localhost/" + raw_url
+
+    # Fast path: slice off scheme+netloc when the netloc ends at a "/" and
+    # urlunsplit would reproduce the rest verbatim.
+    netloc_start = raw_url.find("//") + 2
+    path_start = raw_url.find("/", netloc_start)
+    if path_start != -1:
+        netloc = raw_url[netloc_start:path_start]
+        tail = raw_url[path_start:]
+        if (
+            netloc.isascii()
+            and not _NETLOC_SLOW_RE.search(netloc)
+            and not _TAIL_SLOW_RE.search(tail)
+        ):
+            return "http://localhost" + tail
 
     parts = urlsplit(raw_url)
     return urlunsplit(("http", "localhost", parts.path, parts.query, parts.fragment))
@@ -72,33 +144,36 @@ def preserve_seed(target_url: str, current_url: str) -> str:
 
     Copies missing params from ``current_url`` to ``target_url``.
     If target already has a param with the same value, it is left unchanged.
+    Copied params are appended verbatim; the rest of the target query is
+    not re-encoded.
     """
     if not target_url or not current_url:
         return target_url
 
-    target_parts = urlsplit(target_url)
     current_parts = urlsplit(current_url)
+    if not current_parts.query:
+        return target_url
 
-    target_params = parse_qs(target_parts.query, keep_blank_values=True)
-    current_params = parse_qs(current_parts.query, keep_blank_values=True)
-
-    propagate_keys = ("seed", "web_agent_id", "validator_id")
-    modified = False
-
-    for key in propagate_keys:
-        if key in current_params and key not in target_params:
-            target_params[key] = current_params[key]
-            modified = True
+    target_parts = urlsplit(target_url)
+    present = {m.group(1) for m in _SEED_PARAM_RE.finditer(target_parts.query)}
+    if len(present) == len(_PROPAGATE_KEYS):
+        return target_url
 
-    if not modified:
+    missing = [
+        f"{m.group(1)}={m.group(2) or ''}"
+        for m in _SEED_PARAM_RE.finditer(current_parts.query)
+        if m.group(1) not in present
+    ]
+    if not missing:
         return target_url
 
-    new_query = urlencode(target_params, doseq=True)
+    if target_parts.query:
+        missing.insert(0, target_parts.query)
     return urlunsplit((
         target_parts.scheme,
         target_parts.netloc,
         target_parts.path,
-        new_query,
+        "&".join(missing),
         target_parts.fragment,
     ))
 
@@ -156,15 +231,18 @@ def validate_and_fix(
       (password -> "<password>", email/user label -> "<username>").
     - For "select" with missing text: infers first option from candidate.
     - Returns ``None`` for ambiguous or unrecoverable cases.
+
+    Inferred text is written into *decision* in place and the same dict is
+    returned; callers pass short-lived dicts they own.
     """
     action = decision.get("action", "")
 
     # No-candidate actions pass through
-    if action in ("done", "scroll_down", "scroll_up", "navigate"):
+    if action in _NO_CANDIDATE_ACTIONS:
         return decision
 
     # Candidate-based actions
-    if action in ("click", "type", "select"):
+    if action in _CANDIDATE_ACTIONS:
         raw_cid = decision.get("candidate_id", -1)
         try:
             cid = int(raw_cid)
@@ -184,16 +262,19 @@ def validate_and_fix(
             if not text:
                 # Infer credential placeholders
                 if candidate.input_type == "password":
-                    return {**decision, "text": "<password>"}
-                label_lower = (candidate.label or "").lower()
-                if "user" in label_lower or "email" in label_lower:
-                    return {**decision, "text": "<username>"}
+                    decision["text"] = "<password>"
+                    return decision
+                if _CREDENTIAL_KW_RE.search(candidate.label_lower):
+                    decision["text"] = "<username>"
+                    return decision
                 # Date/placeholder: use placeholder if it looks like a concrete date
                 if candidate.input_type == "date" and candidate.placeholder:
-                    if re.match(r"\d{4}-\d{2}-\d{2}", candidate.placeholder.strip()):
-                        return {**decision, "text": candidate.placeholder.strip()}
+                    if _DATE_RE.match(candidate.placeholder.strip()):
+                        decision["text"] = candidate.placeholder.strip()
+                        return decision
                 if candidate.placeholder and "@" in candidate.placeholder:
-                    return {**decision, "text": "<username>"}
+                    decision["text"] = "<username>"
+                    return decision
                 # Ambiguous -- discard
                 return None
             return decision
@@ -202,7 +283,8 @@ def validate_and_fix(
             text = decision.get("text", "")
             if not text:
                 if candidate.options:
-                    return {**decision, "text": candidate.options[0]}
+                    decision["text"] = candidate.options[0]
+                    return decision
                 return None
             return decision
 
@@ -210,6 +292,85 @@ def validate_and_fix(
     return None
 
 
+# ---------------------------------------------------------------------------
+# Per-action builders (dispatched from build_action)
+# ---------------------------------------------------------------------------
+
+def _build_done(fixed: dict, candidates: list[Candidate], current_url: str) -> None:
+    """Done signal -- no action."""
+    return None
+
+
+def _build_scroll_down(
+    fixed: dict, candidates: list[Candidate], current_url: str
+) -> ScrollAction:
+    return ScrollAction(type="ScrollAction", down=True)
+
+
+def _build_scroll_up(
+    fixed: dict, candidates: list[Candidate], current_url: str
+) -> ScrollAction:
+    return ScrollAction(type="ScrollAction", up=True)
+
+
+def _build_navigate(
+    fixed: dict, candidates: list[Candidate], current_url: str
+) -> NavigateAction | ScrollAction:
+    raw_url = fixed.get("url", "")
+    normalized = normalize_url(raw_url)
+    final_url = preserve_seed(normalized, current_url)
+    # Guard: navigating to the same path+query causes chrome-error loops
+    if _same_path_query(final_url, current_url):
+        return ScrollAction(type="ScrollAction", down=True)
+    return NavigateAction(type="NavigateAction", url=final_url)
+
+
+def _candidate_selector(fixed: dict, candidates: list[Candidate]) -> SelectorUnion:
+    """Selector of the candidate referenced by a validated decision."""
+    return _selector_from_dict(candidates[int(fixed["candidate_id"])].selector)
+
+
+def _build_click(
+    fixed: dict, candidates: list[Candidate], current_url: str
+) -> ClickAction:
+    return ClickAction(
+        type="ClickAction", selector=_candidate_selector(fixed, candidates)
+    )
+
+
+def _build_type(
+    fixed: dict, candidates: list[Candidate], current_url: str
+) -> TypeAction:
+    return TypeAction(
+        type="TypeAction",
+        selector=_candidate_selector(fixed, candidates),
+        text=fixed.get("text", ""),
+    )
+
+
+def _build_select(
+    fixed: dict, candidates: list[Candidate], current_url: str
+) -> SelectDropDownOptionAction:
+    return SelectDropDownOptionAction(
+        type="SelectDropDownOptionAction",
+        selector=_candidate_selector(fixed, candidates),
+        text=fixed.get("text", ""),
+    )
+
+
+_ACTION_BUILDERS: dict[
+    str, Callable[[dict, list[Candidate], str], ActionUnion | None]
+] = {
+    "done": _build_done,
+    "scroll_down": _build_scroll_down,
+    "scroll_up": _build_scroll_up,
+    "navigate": _build_navigate,
+    "click": _build_click,
+    "type": _build_type,
+    "select": _build_select,
+}
+
+
 # ---------------------------------------------------------------------------
 # Action building
 # ---------------------------------------------------------------------------
@@ -231,16 +392,17 @@ def build_action(
     When *step_index* < 5 and candidates exist, falls back to clicking
     the first candidate instead of scrolling (more likely to make progress
     in early steps).
+
+    Valid decisions are dispatched to a per-action builder via
+    ``_ACTION_BUILDERS``.
     """
     # Pre-validate and infer missing fields
     fixed = validate_and_fix(decision, candidates)
     if fixed is None:
         # Early steps: prefer submit/login button over first candidate or scroll
         if step_index < 5 and candidates:
-            submit_keywords = ("submit", "log in", "sign in", "login", "signin")
             for c in candidates:
-                label = (c.label or c.text or "").lower()
-                if any(kw in label for kw in submit_keywords):
+                if _SUBMIT_KW_RE.search(c.label_lower or c.text_lower):
                     selector = _selector_from_dict(c.selector)
                     return ClickAction(type="ClickAction", selector=selector)
             # No submit button: click first candidate
@@ -249,47 +411,8 @@ def build_action(
         # Late steps: scroll is safer
         return ScrollAction(type="ScrollAction", down=True)
 
-    action = fixed.get("action", "")
-
-    # --- Done signal ---
-    if action == "done":
-        return None
-
-    # --- Scroll actions (no candidate needed) ---
-    if action == "scroll_down":
+    builder = _ACTION_BUILDERS.get(fixed.get("action", ""))
+    if builder is None:
+        # --- Unknown action type -> safe fallback ---
         return ScrollAction(type="ScrollAction", down=True)
-    if action == "scroll_up":
-        return ScrollAction(type="ScrollAction", up=True)
-
-    # --- Navigate action ---
-    if action == "navigate":
-        raw_url = fixed.get("url", "")
-        normalized = normalize_url(raw_url)
-        final_url = preserve_seed(normalized, current_url)
-        # Guard: navigating to the same path+query causes chrome-error loops
-        if _same_path_query(final_url, current_url):
-            return ScrollAction(type="ScrollAction", down=True)
-        return NavigateAction(type="NavigateAction", url=final_url)
-
-    # --- Actions requiring candidate_id ---
-    if action in ("click", "type", "select"):
-        cid = int(fixed["candidate_id"])
-        selector = _selector_from_dict(candidates[cid].selector)
-
-        if action == "click":
-            return ClickAction(type="ClickAction", selector=selector)
-
-        if action == "type":
-            text = fixed.get("text", "")
-            return TypeAction(type="TypeAction", selector=selector, text=text)
-
-        if action == "select":
-            text = fixed.get("text", "")
-            return SelectDropDownOptionAction(
-                type="SelectDropDownOptionAction",
-                selector=selector,
-                text=text,
-            )
-
-    # --- Unknown action type -> safe fallback ---
-    return ScrollAction(type="ScrollAction", down=True)
+    return builder(fixed, candidates, current_url)
@@ -7,6 +7,7 @@ deterministic action sequences to eliminate LLM calls for predictable tasks.
 
 from __future__ import annotations
 
+import functools
 import re
 from dataclasses import dataclass
 from enum import Enum
@@ -151,16 +152,147 @@ _TASK_PATTERNS: list[tuple[re.Pattern[str], TaskType]] = [
 ]
 
 
+# All patterns fused into one regex so classification is a single C-level
+# call.  Each pattern sits in its own lookahead anchored at the start and
+# alternatives are tried in list order, so the first *pattern* that matches
+# anywhere wins (a plain alternation would prefer the leftmost match instead).
+# Stays on stdlib ``re``: RE2 has no lookaheads, and prompts are short enough
+# that the patterns' worst-case backtracking is bounded in practice.
+_COMBINED_TASK_PATTERN: re.Pattern[str] = re.compile(
+    "|".join(
+        rf"(?=[\s\S]*?(?P<p{i}>{pattern.pattern}))"
+        for i, (pattern, _) in enumerate(_TASK_PATTERNS)
+    ),
+    re.IGNORECASE,
+)
+
+# Cheap prefilter: every match of every pattern above contains at least one
+# of these literals (e.g. ``go\s+to`` -> "go", ``add\s+to\s+cart`` -> "cart").
+# Keep in sync when adding a pattern.
+_TASK_PREFILTER_TOKENS = (
+    "log", "sign", "authenticat", "regist", "create", "contact", "search",
+    "find", "look", "query", "navig", "go", "visit", "browse", "delete",
+    "remove", "edit", "update", "add", "form", "checkout", "cart", "order",
+    "pay", "profile", "account", "preference", "subscribe", "newsletter",
+    "download", "save", "get", "share", "post", "book", "reserv", "schedule",
+)
+
+
+@functools.lru_cache(maxsize=1024)
 def classify_task(prompt: str) -> TaskType:
     """Classify a task prompt into a TaskType using keyword patterns.
 
-    Scans the prompt against ``_TASK_PATTERNS`` in order and returns
-    the first match.  Returns ``TaskType.UNKNOWN`` if no pattern matches.
+    Matches the prompt against ``_TASK_PATTERNS`` in order (via
+    ``_COMBINED_TASK_PATTERN``) and returns the first match.  Returns
+    ``TaskType.UNKNOWN`` if no pattern matches, without running the regex
+    when none of ``_TASK_PREFILTER_TOKENS`` occurs in the prompt.
+
+    Results are memoized per prompt (the same task prompt is classified on
+    every step); use ``classify_task.cache_clear()`` to reset.
     """
-    for pattern, task_type in _TASK_PATTERNS:
-        if pattern.search(prompt):
-            return task_type
-    return TaskType.UNKNOWN
+    folded = prompt.casefold()
+    if not any(tok in folded for tok in _TASK_PREFILTER_TOKENS):
+        return TaskType.UNKNOWN
+    m = _COMBINED_TASK_PATTERN.match(prompt)
+    if m is None:
+        return TaskType.UNKNOWN
+    return _TASK_PATTERNS[int(m.lastgroup[1:])][1]
+
+
+# ---------------------------------------------------------------------------
+# Label keyword matchers
+# ---------------------------------------------------------------------------
+
+
+def _keyword_pattern(*keywords: str) -> re.Pattern[str]:
+    """Compile *keywords* into one alternation for a single-pass substring scan.
+
+    Matched against already-lowercased labels, so no ``IGNORECASE``.
+    """
+    return re.compile("|".join(re.escape(kw) for kw in keywords))
+
+
+_USERNAME_KW_RE = _keyword_pattern("user", "email", "login")
+_SUBMIT_KW_RE = _keyword_pattern("log in", "sign in", "login", "submit", "enter")
+_LOGOUT_KW_RE = _keyword_pattern("logout", "log out", "sign out")
+_SEARCH_KW_RE = _keyword_pattern("search", "go", "submit", "find", "query")
+_SEARCH_INPUT_KW_RE = _keyword_pattern("search", "query")
+_REGISTER_USERNAME_KW_RE = _keyword_pattern("user", "name", "login")
+_REGISTER_KW_RE = _keyword_pattern("register", "sign up", "create", "submit")
+
+_CONTACT_NAME_KW_RE = _keyword_pattern("name", "your name", "full name")
+_CONTACT_SUBMIT_KW_RE = _keyword_pattern("send", "submit", "contact")
+_CONTACT_SKIP_KW_RE = _keyword_pattern("subject", "message")
+
+# Input types accepted for each kind of free-text field.
+_TEXT_INPUT_TYPES = frozenset({"text", ""})
+_LOGIN_INPUT_TYPES = frozenset({"text", "email", ""})
+_SEARCH_INPUT_TYPES = frozenset({"search", "text", ""})
+_LOGOUT_TAGS = frozenset({"button", "a", "input"})
+
+
+# ---------------------------------------------------------------------------
+# Shared button index
+# ---------------------------------------------------------------------------
+
+
+def _is_submit_like(c: Candidate) -> bool:
+    """Return True for ``<button>`` and ``<input type="submit">`` candidates."""
+    return c.tag == "button" or (c.tag == "input" and c.input_type == "submit")
+
+
+@dataclass
+class ButtonIndex:
+    """Submit-style buttons on a page, grouped by label keyword category.
+
+    Built once per page by ``build_button_index()`` and shared between the
+    ``detect_*`` functions so each does not rescan the candidate list for
+    its submit button.  Categories are computed on first access and hold
+    candidate IDs in page order.
+    """
+
+    candidates: list[Candidate]
+    buttons: list[Candidate]
+
+    def _matching(self, pattern: re.Pattern[str]) -> list[int]:
+        return [
+            b.id for b in self.buttons if pattern.search(b.label_lower or b.text_lower)
+        ]
+
+    @functools.cached_property
+    def submit_login(self) -> list[int]:
+        return self._matching(_SUBMIT_KW_RE)
+
+    @functools.cached_property
+    def submit_register(self) -> list[int]:
+        return self._matching(_REGISTER_KW_RE)
+
+    @functools.cached_property
+    def submit_search(self) -> list[int]:
+        return self._matching(_SEARCH_KW_RE)
+
+    @functools.cached_property
+    def logout(self) -> list[int]:
+        # Logout targets also include links and plain inputs.
+        return [
+            c.id
+            for c in self.candidates
+            if c.tag in _LOGOUT_TAGS
+            and _LOGOUT_KW_RE.search(c.label_lower or c.text_lower)
+        ]
+
+
+def build_button_index(candidates: list[Candidate]) -> ButtonIndex:
+    """Collect the submit-style buttons of *candidates* into a ``ButtonIndex``."""
+    return ButtonIndex(
+        candidates=candidates,
+        buttons=[c for c in candidates if _is_submit_like(c)],
+    )
+
+
+# =========================================================================
+# Login shortcut
+# =========================================================================
 
 
 @dataclass
@@ -172,7 +304,9 @@ class LoginFields:
     submit_id: int
 
 
-def detect_login_fields(candidates: list[Candidate]) -> LoginFields | None:
+def detect_login_fields(
+    candidates: list[Candidate], buttons: ButtonIndex | None = None
+) -> LoginFields | None:
     """Detect username, password, and submit fields in candidates.
 
     Returns ``LoginFields`` if all three are found, ``None`` otherwise.
@@ -184,7 +318,11 @@ def detect_login_fields(candidates: list[Candidate]) -> LoginFields | None:
     - **Submit:** ``<button>`` or ``<input type="submit">`` with label
       containing 'log in', 'sign in', 'login', 'submit', or 'enter'.
       Fallback: button in the same ``parent_form`` as the password field.
+
+    *buttons* may be passed to reuse a page's ``ButtonIndex``.
     """
+    if buttons is None:
+        buttons = build_button_index(candidates)
     username_id: int | None = None
     password_id: int | None = None
     submit_id: int | None = None
@@ -198,30 +336,20 @@ def detect_login_fields(candidates: list[Candidate]) -> LoginFields | None:
             continue
 
         # Username field
-        if c.tag == "input" and c.input_type in ("text", "email", ""):
-            label_lower = (c.label or "").lower()
-            if any(kw in label_lower for kw in ("user", "email", "login")):
+        if c.tag == "input" and c.input_type in _LOGIN_INPUT_TYPES:
+            if _USERNAME_KW_RE.search(c.label_lower):
                 if username_id is None:
                     username_id = c.id
                     continue
 
     # Submit button: prefer button with matching label, fallback to same form
-    for c in candidates:
-        if c.tag == "button" or (c.tag == "input" and c.input_type == "submit"):
-            label_lower = (c.label or c.text or "").lower()
-            if any(
-                kw in label_lower
-                for kw in ("log in", "sign in", "login", "submit", "enter")
-            ):
-                submit_id = c.id
-                break
-            # Fallback: button in same form as password field
-            if (
-                password_form
-                and c.parent_form == password_form
-                and submit_id is None
-            ):
-                submit_id = c.id
+    if buttons.submit_login:
+        submit_id = buttons.submit_login[0]
+    elif password_form:
+        submit_id = next(
+            (b.id for b in buttons.buttons if b.parent_form == password_form),
+            None,
+        )
 
     if (
         username_id is not None
@@ -279,17 +407,18 @@ class LogoutTarget:
     button_id: int
 
 
-def detect_logout_target(candidates: list[Candidate]) -> LogoutTarget | None:
+def detect_logout_target(
+    candidates: list[Candidate], buttons: ButtonIndex | None = None
+) -> LogoutTarget | None:
     """Find a logout/sign-out button or link in candidates.
 
     Returns ``LogoutTarget`` if found, ``None`` otherwise.
+    *buttons* may be passed to reuse a page's ``ButtonIndex``.
     """
-    for c in candidates:
-        if c.tag not in ("button", "a", "input"):
-            continue
-        label_lower = (c.label or c.text or "").lower()
-        if any(kw in label_lower for kw in ("logout", "log out", "sign out")):
-            return LogoutTarget(button_id=c.id)
+    if buttons is None:
+        buttons = build_button_index(candidates)
+    if buttons.logout:
+        return LogoutTarget(button_id=buttons.logout[0])
     return None
 
 
@@ -321,20 +450,53 @@ class RegistrationFields:
     confirm_password_id: int | None
     submit_id: int
 
+    @functools.cached_property
+    def steps(self) -> tuple[dict, ...]:
+        """Registration action sequence, built once per detected form.
+
+        Steps depend on which fields exist:
+            - Type username
+            - Type email (if separate field)
+            - Type password
+            - Type confirm password (if exists)
+            - Click submit
+        """
+        steps: list[dict] = [
+            {"action": "type", "candidate_id": self.username_id, "text": "<username>"},
+        ]
+        if self.email_id is not None:
+            steps.append(
+                {"action": "type", "candidate_id": self.email_id, "text": "<email>"}
+            )
+        steps.append(
+            {"action": "type", "candidate_id": self.password_id, "text": "<password>"}
+        )
+        if self.confirm_password_id is not None:
+            steps.append(
+                {"action": "type", "candidate_id": self.confirm_password_id, "text": "<password>"}
+            )
+        steps.append({"action": "click", "candidate_id": self.submit_id})
+        return tuple(steps)
 
-def detect_registration_fields(candidates: list[Candidate]) -> RegistrationFields | None:
+
+def detect_registration_fields(
+    candidates: list[Candidate], buttons: ButtonIndex | None = None
+) -> RegistrationFields | None:
     """Detect registration form fields in candidates.
 
     Returns ``RegistrationFields`` if at least username, password, and submit
     are found.  ``email_id`` and ``confirm_password_id`` may be ``None``.
+    *buttons* may be passed to reuse a page's ``ButtonIndex``.
     """
+    if buttons is None:
+        buttons = build_button_index(candidates)
     username_id: int | None = None
     email_id: int | None = None
     password_ids: list[int] = []
     submit_id: int | None = None
 
     for c in candidates:
-        label_lower = (c.label or c.text or "").lower()
+        label_lower = c.label_lower or c.text_lower
 
         # Password fields (collect all -- first is password, second is confirm)
         if c.input_type == "password":
@@ -348,8 +510,8 @@ def detect_registration_fields(candidates: list[Candidate]) -> RegistrationField
                 continue
 
         # Username field
-        if c.tag == "input" and c.input_type in ("text", ""):
-            if any(kw in label_lower for kw in ("user", "name", "login")):
+        if c.tag == "input" and c.input_type in _TEXT_INPUT_TYPES:
+            if _REGISTER_USERNAME_KW_RE.search(label_lower):
                 if username_id is None:
                     username_id = c.id
                     continue
@@ -358,19 +520,12 @@ def detect_registration_fields(candidates: list[Candidate]) -> RegistrationField
                 email_id = c.id
                 continue
 
-    # Submit button
-    for c in candidates:
-        if c.tag == "button" or (c.tag == "input" and c.input_type == "submit"):
-            label_lower = (c.label or c.text or "").lower()
-            if any(
-                kw in label_lower
-                for kw in ("register", "sign up", "create", "submit")
-            ):
-                submit_id = c.id
-                break
-            # Fallback: any button after password fields
-            if password_ids and submit_id is None:
-                submit_id = c.id
+    # Submit button: prefer button with matching label, fallback to first
+    # button (only used when the page has password fields)
+    if buttons.submit_register:
+        submit_id = buttons.submit_register[0]
+    elif buttons.buttons:
+        submit_id = buttons.buttons[0].id
 
     if not password_ids or submit_id is None:
         return None
@@ -395,33 +550,15 @@ def detect_registration_fields(candidates: list[Candidate]) -> RegistrationField
 def get_registration_action(step_index: int, fields: RegistrationFields) -> dict | None:
     """Return the hard-coded action dict for a registration sequence step.
 
-    Steps are dynamically built based on which fields exist:
-        - Type username
-        - Type email (if separate field)
-        - Type password
-        - Type confirm password (if exists)
-        - Click submit
+    Steps come from ``fields.steps`` (see ``RegistrationFields.steps``).
+    A copy is returned so callers may fill in fields without touching the
+    cached table.
 
     Returns ``None`` when sequence is complete.
     """
-    steps: list[dict] = [
-        {"action": "type", "candidate_id": fields.username_id, "text": "<username>"},
-    ]
-    if fields.email_id is not None:
-        steps.append(
-            {"action": "type", "candidate_id": fields.email_id, "text": "<email>"}
-        )
-    steps.append(
-        {"action": "type", "candidate_id": fields.password_id, "text": "<password>"}
-    )
-    if fields.confirm_password_id is not None:
-        steps.append(
-            {"action": "type", "candidate_id": fields.confirm_password_id, "text": "<password>"}
-        )
-    steps.append({"action": "click", "candidate_id": fields.submit_id})
-
+    steps = fields.steps
     if step_index < len(steps):
-        return steps[step_index]
+        return dict(steps[step_index])
     return None
 
 
@@ -438,43 +575,37 @@ class SearchFields:
     submit_id: int
 
 
-def detect_search_fields(candidates: list[Candidate]) -> SearchFields | None:
+def detect_search_fields(
+    candidates: list[Candidate], buttons: ButtonIndex | None = None
+) -> SearchFields | None:
     """Detect a search input and submit button in candidates.
 
     Returns ``SearchFields`` if both are found, ``None`` otherwise.
     Search input: input[type=search] or input[type=text] with label/placeholder
     containing 'search'. Submit: button or input[type=submit] with label
     containing 'search', 'go', 'submit', etc.
+    *buttons* may be passed to reuse a page's ``ButtonIndex``.
     """
+    if buttons is None:
+        buttons = build_button_index(candidates)
     search_input_id: int | None = None
-    submit_id: int | None = None
+    first_input_id: int | None = None
+    submit_id = buttons.submit_search[0] if buttons.submit_search else None
+    if submit_id is None:
+        return None
 
     for c in candidates:
-        label_ph = (c.label or c.text or c.placeholder or "").lower()
-        if c.tag == "input" and c.input_type in ("search", "text", ""):
-            if "search" in label_ph or "query" in label_ph:
-                if search_input_id is None:
-                    search_input_id = c.id
-                    break
-
-    if search_input_id is None:
-        # Fallback: first text/search input
-        for c in candidates:
-            if c.tag == "input" and c.input_type in ("search", "text", ""):
+        if c.tag == "input" and c.input_type in _SEARCH_INPUT_TYPES:
+            if first_input_id is None:
+                first_input_id = c.id
+            label_ph = c.label_lower or c.text_lower or c.placeholder_lower
+            if _SEARCH_INPUT_KW_RE.search(label_ph):
                 search_input_id = c.id
                 break
 
-    for c in candidates:
-        if c.tag in ("button", "input") and (
-            (c.tag == "input" and c.input_type == "submit") or c.tag == "button"
-        ):
-            label_lower = (c.label or c.text or "").lower()
-            if any(
-                kw in label_lower
-                for kw in ("search", "go", "submit", "find", "query")
-            ):
-                submit_id = c.id
-                break
+    if search_input_id is None:
+        # Fallback: first text/search input
+        search_input_id = first_input_id
 
     if search_input_id is not None and submit_id is not None:
         return SearchFields(
@@ -521,6 +652,32 @@ class ContactFields:
     message_id: int | None
     submit_id: int
 
+    @functools.cached_property
+    def steps(self) -> tuple[dict, ...]:
+        """Contact form action sequence, built once per detected form.
+
+        Steps depend on which fields exist:
+            - Type name (if exists)
+            - Type email (if exists)
+            - Type message (if textarea exists)
+            - Click submit
+        """
+        steps: list[dict] = []
+        if self.name_id is not None:
+            steps.append(
+                {"action": "type", "candidate_id": self.name_id, "text": "Test User"}
+            )
+        if self.email_id is not None:
+            steps.append(
+                {"action": "type", "candidate_id": self.email_id, "text": "test@example.com"}
+            )
+        if self.message_id is not None:
+            steps.append(
+                {"action": "type", "candidate_id": self.message_id, "text": "Hello, this is a test message."}
+            )
+        steps.append({"action": "click", "candidate_id": self.submit_id})
+        return tuple(steps)
+
 
 def detect_contact_fields(candidates: list[Candidate]) -> ContactFields | None:
     """Detect contact form fields in candidates.
@@ -531,48 +688,57 @@ def detect_contact_fields(candidates: list[Candidate]) -> ContactFields | None:
     name_id: int | None = None
     email_id: int | None = None
     message_id: int | None = None
-    submit_id: int | None = None
+    preferred_submit_id: int | None = None  # first keyword-matching button
+    fallback_submit_id: int | None = None  # first button of any kind
 
+    # Fields and the submit button are resolved in one pass; button
+    # candidates never match the field branches below.
     for c in candidates:
-        label_lower = (c.label or c.text or "").lower()
+        label_lower = c.label_lower or c.text_lower
+
+        if _is_submit_like(c):
+            if preferred_submit_id is None:
+                if _CONTACT_SUBMIT_KW_RE.search(label_lower):
+                    preferred_submit_id = c.id
+                    if (
+                        name_id is not None
+                        and email_id is not None
+                        and message_id is not None
+                    ):
+                        break
+                elif fallback_submit_id is None:
+                    fallback_submit_id = c.id
+            continue
 
         if c.tag == "textarea" and message_id is None:
             message_id = c.id
             continue
 
-        if c.tag == "input" and c.input_type in ("email",):
+        if c.tag == "input" and c.input_type == "email":
             if email_id is None:
                 email_id = c.id
                 continue
 
-        if c.tag == "input" and c.input_type in ("text", ""):
-            if any(kw in label_lower for kw in ("name", "your name", "full name")):
+        if c.tag == "input" and c.input_type in _TEXT_INPUT_TYPES:
+            if _CONTACT_NAME_KW_RE.search(label_lower):
                 if name_id is None:
                     name_id = c.id
                     continue
             if "email" in label_lower and email_id is None:
                 email_id = c.id
                 continue
-            if "subject" in label_lower or "message" in label_lower:
+            if _CONTACT_SKIP_KW_RE.search(label_lower):
                 continue  # skip non-essential text fields
             # Generic text input -- use as name if none found yet
             if name_id is None:
                 name_id = c.id
                 continue
 
-    # Submit button
-    for c in candidates:
-        if c.tag == "button" or (c.tag == "input" and c.input_type == "submit"):
-            label_lower = (c.label or c.text or "").lower()
-            if any(
-                kw in label_lower
-                for kw in ("send", "submit", "contact")
-            ):
-                submit_id = c.id
-                break
-            if submit_id is None:
-                submit_id = c.id
-
+    submit_id = (
+        preferred_submit_id
+        if preferred_submit_id is not None
+        else fallback_submit_id
+    )
     if submit_id is None:
         return None
     # Need at least one typeable field
@@ -590,29 +756,13 @@ def detect_contact_fields(candidates: list[Candidate]) -> ContactFields | None:
 def get_contact_action(step_index: int, fields: ContactFields) -> dict | None:
     """Return the hard-coded action dict for a contact form sequence step.
 
-    Steps are dynamically built based on which fields exist:
-        - Type name (if exists)
-        - Type email (if exists)
-        - Type message (if textarea exists)
-        - Click submit
+    Steps come from ``fields.steps`` (see ``ContactFields.steps``).
+    A copy is returned so callers may fill in fields without touching the
+    cached table.
 
     Returns ``None`` when sequence is complete.
     """
-    steps: list[dict] = []
-    if fields.name_id is not None:
-        steps.append(
-            {"action": "type", "candidate_id": fields.name_id, "text": "Test User"}
-        )
-    if fields.email_id is not None:
-        steps.append(
-            {"action": "type", "candidate_id": fields.email_id, "text": "test@example.com"}
-        )
-    if fields.message_id is not None:
-        steps.append(
-            {"action": "type", "candidate_id": fields.message_id, "text": "Hello, this is a test message."}
-        )
-    steps.append({"action": "click", "candidate_id": fields.submit_id})
-
+    steps = fields.steps
     if step_index < len(steps):
-        return steps[step_index]
+        return dict(steps[step_index])
     return None
@@ -7,10 +7,12 @@ response validation, and action building into a single ``decide()`` function.
 from __future__ import annotations
 
 import logging
+from typing import TYPE_CHECKING, Callable
 
 from agent.actions import build_action, validate_and_fix
 from agent.classifier import (
     TaskType,
+    build_button_index,
     classify_task,
     detect_contact_fields,
     detect_login_fields,
@@ -28,16 +30,27 @@ from agent.prompts import (
     build_user_prompt,
     format_history_entry,
 )
-from agent.state import check_loop, clear_task_state, get_action_signature
-from llm.client import LLMClient
+from agent.state import (
+    check_loop,
+    clear_task_state,
+    count_history_actions,
+    get_action_signature,
+    get_history_cache,
+    get_page_cache,
+    set_history_cache,
+    set_page_cache,
+)
 from llm.parser import normalize_decision, parse_llm_json
 from models.actions import ScrollAction
 from models.request import ActRequest
 from models.response import ActResponse
-from parsing.candidates import extract_candidates
+from parsing.candidates import Candidate, extract_candidates
 from parsing.page_ir import build_page_ir
 from parsing.pruning import prune_html
 
+if TYPE_CHECKING:
+    from llm.client import LLMClient
+
 logger = logging.getLogger("agent")
 
 # Module-level singleton for LLM client (lazy init).
@@ -45,21 +58,59 @@ _llm_client: LLMClient | None = None
 
 
 def _get_llm_client() -> LLMClient:
-    """Return the module-level LLM client, creating it on first use."""
+    """Return the module-level LLM client, creating it on first use.
+
+    ``llm.client`` (httpx, tenacity) is imported here rather than at module
+    load, so processes whose tasks stay on the hard-coded paths never pay
+    for it.
+    """
     global _llm_client  # noqa: PLW0603
     if _llm_client is None:
+        from llm.client import LLMClient
+
         _llm_client = LLMClient()
     return _llm_client
 
 
-def _build_history_lines(history: list[dict]) -> list[str]:
+async def close_llm_client() -> None:
+    """Close the module-level LLM client's connection pool, if one was opened."""
+    global _llm_client  # noqa: PLW0603
+    if _llm_client is not None:
+        await _llm_client.close()
+        _llm_client = None
+
+
+# The system prompt is static, so its message dict is built once and shared
+# by every request (never mutated downstream).
+_SYSTEM_MESSAGE: dict = {"role": "system", "content": build_system_prompt()}
+
+
+def _build_history_lines(
+    history: list[dict], task_id: str | None = None
+) -> list[str]:
     """Convert the evaluator's history list into formatted history strings.
 
     The evaluator provides entries with keys like ``action``, ``url``,
     ``exec_ok``, ``error``. Each is formatted as a readable summary.
+
+    With a *task_id*, lines formatted on earlier steps are reused when the
+    history has only been appended to since, so only the new tail is
+    formatted. The last entry formatted is kept as a fingerprint: if
+    ``history`` no longer holds it at the same position, everything is
+    formatted again. The reused list is extended in place and returned, so
+    callers must not hold on to it across steps.
     """
     lines: list[str] = []
-    for i, entry in enumerate(history):
+    start = 0
+    cached = get_history_cache(task_id) if task_id else None
+    if cached is not None:
+        n, last_entry, cached_lines = cached
+        if 0 < n <= len(history) and history[n - 1] == last_entry:
+            lines = cached_lines
+            start = n
+
+    for i in range(start, len(history)):
+        entry = history[i]
         action_type = entry.get("action", "unknown")
         # Try to extract a meaningful element description
         element_text = entry.get("element_text", entry.get("text", ""))
@@ -88,10 +139,49 @@ def _build_history_lines(history: list[dict]) -> list[str]:
                 url_changed=url_changed,
             )
         )
+
+    if task_id and history:
+        set_history_cache(task_id, len(history), history[-1], lines)
     return lines
 
 
-def decide(request: ActRequest) -> ActResponse:
+# ---------------------------------------------------------------------------
+# Hard-coded sequences (pre-LLM bypass)
+# ---------------------------------------------------------------------------
+
+# Task types whose whole form sequence is indexed by step_index:
+# (log name, field detector, step -> action dict). LOGOUT is special-cased
+# in decide() because it may have to log in first.
+_HARDCODED_SEQUENCES: dict[TaskType, tuple[str, Callable, Callable]] = {
+    TaskType.LOGIN: ("login", detect_login_fields, get_login_action),
+    TaskType.REGISTRATION: (
+        "registration", detect_registration_fields, get_registration_action,
+    ),
+    TaskType.CONTACT: ("contact", detect_contact_fields, get_contact_action),
+    TaskType.SEARCH: ("search", detect_search_fields, get_search_action),
+}
+
+
+def _hardcoded_response(
+    name: str, action_dict: dict, candidates: list[Candidate], request: ActRequest
+) -> ActResponse | None:
+    """Build and log a hard-coded action, or return ``None`` if it is "done"."""
+    action = build_action(action_dict, candidates, request.url)
+    if action is None:
+        return None
+    logger.info(
+        "hardcoded %s action",
+        name,
+        extra={
+            "task_id": request.task_id,
+            "step_index": request.step_index,
+            "action_type": action.type,
+        },
+    )
+    return ActResponse(actions=[action])
+
+
+async def decide(request: ActRequest) -> ActResponse:
     """Main decision function called from the /act endpoint.
 
     Orchestrates:
@@ -110,143 +200,95 @@ def decide(request: ActRequest) -> ActResponse:
         An ``ActResponse`` with the chosen action(s), or empty actions
         for "done" signal, or a ScrollAction fallback on exhausted retries.
     """
-    # 1. Prune HTML (single parse -- replaces dual-parse pattern)
-    pruned_soup = prune_html(request.snapshot_html)
-    title = pruned_soup.title.string if pruned_soup.title and pruned_soup.title.string else ""
-
-    # 2. Extract interactive elements from pruned soup
-    candidates = extract_candidates("", soup=pruned_soup)
+    # 1-2. Reuse the task's parsed page when the snapshot is unchanged since
+    # its previous step (e.g. after a failed or no-op action).
+    page = get_page_cache(request.task_id, request.snapshot_html)
+    if page is None:
+        # 1. Prune HTML (single parse -- replaces dual-parse pattern)
+        pruned_soup = prune_html(request.snapshot_html)
+        title = pruned_soup.title.string if pruned_soup.title and pruned_soup.title.string else ""
+
+        # 2. Extract interactive elements from pruned soup
+        candidates = extract_candidates("", soup=pruned_soup)
+
+        page = {
+            "soup": pruned_soup,
+            "title": title,
+            "candidates": candidates,
+            "ir_url": None,
+            "page_ir": None,
+        }
+        set_page_cache(request.task_id, request.snapshot_html, page)
+    else:
+        pruned_soup = page["soup"]
+        title = page["title"]
+        candidates = page["candidates"]
 
     # 3. Task classification and hard-coded sequence check (pre-LLM bypass)
     task_type = classify_task(request.prompt)
-    if task_type == TaskType.LOGIN:
-        login_fields = detect_login_fields(candidates)
-        if login_fields is not None:
-            action_dict = get_login_action(request.step_index, login_fields)
-            if action_dict is not None:
-                action = build_action(action_dict, candidates, request.url)
-                if action is not None:
-                    logger.info(
-                        "hardcoded login action",
-                        extra={
-                            "task_id": request.task_id,
-                            "step_index": request.step_index,
-                            "action_type": type(action).__name__,
-                        },
-                    )
-                    return ActResponse(actions=[action])
-            # step_index >= 3 or action_dict is None: fall through to LLM
-
     if task_type == TaskType.LOGOUT:
+        # Both shortcuts below look for buttons; classify them once.
+        buttons = build_button_index(candidates)
+
         # Priority 1: logout button visible → click it
-        logout_target = detect_logout_target(candidates)
+        logout_target = detect_logout_target(candidates, buttons)
         if logout_target is not None:
             action_dict = {"action": "click", "candidate_id": logout_target.button_id}
-            action = build_action(action_dict, candidates, request.url)
-            if action is not None:
-                logger.info(
-                    "hardcoded logout action",
-                    extra={
-                        "task_id": request.task_id,
-                        "step_index": request.step_index,
-                        "action_type": type(action).__name__,
-                    },
-                )
-                return ActResponse(actions=[action])
+            response = _hardcoded_response("logout", action_dict, candidates, request)
+            if response is not None:
+                return response
 
         # Priority 2: login form visible → login first (LOGOUT tasks
         # often require "authenticate first, then log out")
-        login_fields = detect_login_fields(candidates)
+        login_fields = detect_login_fields(candidates, buttons)
         if login_fields is not None:
             # Determine login sub-step by counting type actions in history
-            type_count = sum(
-                1 for h in request.history
-                if h.get("action", "") == "type"  # exact match, not substring
+            type_count, saw_click = count_history_actions(
+                request.task_id, request.history
             )
             # Login sequence: type(0), type(1), click(2).
             # After click-submit, type_count stays at 2 but a click exists.
             # If both conditions met, login is done — fall through to LLM.
-            login_done = type_count >= 2 and any(
-                h.get("action", "") == "click" for h in request.history
-            )
+            login_done = type_count >= 2 and saw_click
             if not login_done:
                 step = min(type_count, 2)
                 action_dict = get_login_action(step, login_fields)
                 if action_dict is not None:
-                    action = build_action(action_dict, candidates, request.url)
-                    if action is not None:
-                        logger.info(
-                            "hardcoded logout(login-first) action",
-                            extra={
-                                "task_id": request.task_id,
-                                "step_index": request.step_index,
-                                "action_type": type(action).__name__,
-                            },
-                        )
-                        return ActResponse(actions=[action])
-
-    if task_type == TaskType.REGISTRATION:
-        reg_fields = detect_registration_fields(candidates)
-        if reg_fields is not None:
-            action_dict = get_registration_action(request.step_index, reg_fields)
-            if action_dict is not None:
-                action = build_action(action_dict, candidates, request.url)
-                if action is not None:
-                    logger.info(
-                        "hardcoded registration action",
-                        extra={
-                            "task_id": request.task_id,
-                            "step_index": request.step_index,
-                            "action_type": type(action).__name__,
-                        },
+                    response = _hardcoded_response(
+                        "logout(login-first)", action_dict, candidates, request
                     )
-                    return ActResponse(actions=[action])
-
-    if task_type == TaskType.CONTACT:
-        contact_fields = detect_contact_fields(candidates)
-        if contact_fields is not None:
-            action_dict = get_contact_action(request.step_index, contact_fields)
-            if action_dict is not None:
-                action = build_action(action_dict, candidates, request.url)
-                if action is not None:
-                    logger.info(
-                        "hardcoded contact action",
-                        extra={
-                            "task_id": request.task_id,
-                            "step_index": request.step_index,
-                            "action_type": type(action).__name__,
-                        },
-                    )
-                    return ActResponse(actions=[action])
-
-    if task_type == TaskType.SEARCH:
-        search_fields = detect_search_fields(candidates)
-        if search_fields is not None:
-            action_dict = get_search_action(request.step_index, search_fields)
+                    if response is not None:
+                        return response
+
+    sequence = _HARDCODED_SEQUENCES.get(task_type)
+    if sequence is not None:
+        name, detect_fields, get_action = sequence
+        fields = detect_fields(candidates)
+        if fields is not None:
+            action_dict = get_action(request.step_index, fields)
             if action_dict is not None:
-                action = build_action(action_dict, candidates, request.url)
-                if action is not None:
-                    logger.info(
-                        "hardcoded search action",
-                        extra={
-                            "task_id": request.task_id,
-                            "step_index": request.step_index,
-                            "action_type": type(action).__name__,
-                        },
-                    )
-                    return ActResponse(actions=[action])
-
-    # 4. Build compact Page IR (smaller budget = faster LLM round-trip)
-    page_ir = build_page_ir(
-        pruned_soup, request.url, title, candidates,
-        max_tokens=900,
-    )
+                response = _hardcoded_response(name, action_dict, candidates, request)
+                if response is not None:
+                    return response
+            # Sequence exhausted or action_dict is None: fall through to LLM
+
+    # 4. Build compact Page IR (smaller budget = faster LLM round-trip);
+    # the IR embeds the URL, so a cached one is only reused for the same URL.
+    if page["ir_url"] == request.url:
+        page_ir = page["page_ir"]
+    else:
+        page_ir = build_page_ir(
+            pruned_soup, request.url, title, candidates,
+            max_tokens=900,
+        )
+        page["ir_url"] = request.url
+        page["page_ir"] = page_ir
 
     # 5. Compute steps remaining
     steps_remaining = max(1, 12 - request.step_index)
 
     # 6. Build history lines
-    history_lines = _build_history_lines(request.history)
+    history_lines = _build_history_lines(request.history, request.task_id)
 
     # 7. Loop detection -- use last action sig from history
     loop_hint: str | None = None
@@ -258,7 +300,6 @@ def decide(request: ActRequest) -> ActResponse:
         last_action_failed = not last_entry.get("exec_ok", True)
 
     # 8. Build LLM messages
-    system_msg = build_system_prompt()
     user_msg = build_user_prompt(
         task_prompt=request.prompt,
         page_ir=page_ir,
@@ -269,7 +310,7 @@ def decide(request: ActRequest) -> ActResponse:
     )
 
     messages = [
-        {"role": "system", "content": system_msg},
+        _SYSTEM_MESSAGE,
         {"role": "user", "content": user_msg},
     ]
 
@@ -282,7 +323,7 @@ def decide(request: ActRequest) -> ActResponse:
     for attempt in range(max_retries + 1):
         try:
             # 9. Call LLM (smaller max_tokens = faster completion)
-            resp = client.chat_completions(
+            resp = await client.chat_completions(
                 task_id=request.task_id,
                 messages=messages,
                 max_tokens=256,
@@ -333,7 +374,7 @@ def decide(request: ActRequest) -> ActResponse:
 
             # 14. Valid action obtained (build_action returns ScrollAction
             # fallback for invalid decisions, never None except for "done")
-            action_type = type(action).__name__
+            action_type = action.type
             logger.info(
                 "agent decided",
                 extra={
@@ -89,38 +89,37 @@ def build_user_prompt(
     history_text = "\n".join(history_lines) if history_lines else "No actions yet"
 
     # Task context: first sentence of task so the model keeps the goal in mind
-    task_context = task_prompt.strip().split(".")[0].strip()
-    if not task_context:
-        task_context = task_prompt.strip()[:120] if task_prompt.strip() else ""
-
-    parts = []
-    if task_context:
-        parts.append(f"TASK CONTEXT: {task_context}")
-    parts.extend([
-        f"TASK: {task_prompt}",
-        "",
-        page_ir,
-        "",
-        "HISTORY:",
-        history_text,
-        "",
-    ])
-
-    # Steps remaining with urgency at 3 or fewer
-    steps_line = f"STEPS REMAINING: {steps_remaining}"
-    if steps_remaining <= 3:
-        steps_line += " -- Take the most direct action to complete the task."
-    parts.append(steps_line)
-
-    if last_action_failed:
-        parts.append("")
-        parts.append("Last action failed. Try a different action or element.")
-
-    if loop_hint:
-        parts.append("")
-        parts.append(f"WARNING: {loop_hint}")
-
-    parts.append("")
-    parts.append("Choose your next action. Return JSON only.")
-
-    return "\n".join(parts)
+    stripped = task_prompt.strip()
+    task_context = stripped.partition(".")[0].strip() or stripped[:120]
+
+    # Optional lines/blocks, empty when absent
+    context_line = f"TASK CONTEXT: {task_context}\n" if task_context else ""
+    # Urgency at 3 or fewer steps remaining
+    urgency = (
+        " -- Take the most direct action to complete the task."
+        if steps_remaining <= 3
+        else ""
+    )
+    failed_block = (
+        "\n\nLast action failed. Try a different action or element."
+        if last_action_failed
+        else ""
+    )
+    loop_block = f"\n\nWARNING: {loop_hint}" if loop_hint else ""
+
+    # Single template: one string build instead of list appends + join
+    return (
+        f"{context_line}"
+        f"TASK: {task_prompt}\n"
+        "\n"
+        f"{page_ir}\n"
+        "\n"
+        "HISTORY:\n"
+        f"{history_text}\n"
+        "\n"
+        f"STEPS REMAINING: {steps_remaining}{urgency}"
+        f"{failed_block}"
+        f"{loop_block}\n"
+        "\n"
+        "Choose your next action. Return JSON only."
+    )
@@ -2,14 +2,76 @@
 
 Tracks the last action signature and URL per task to detect when the agent
 is stuck in a loop (same action + URL repeated 2+ times). Sends a
-course-correction hint to the LLM when a loop is detected.
+course-correction hint to the LLM when a loop is detected. Also caches the
+formatted history lines per task so each step only formats new entries,
+and the parsed page so an unchanged snapshot is not parsed again.
+
+Tasks that never signal done are never cleared explicitly, so both stores
+are bounded LRU dicts that evict the least recently used task.
 """
 
 from __future__ import annotations
 
+from collections import OrderedDict
+
+# Upper bound on tasks tracked per store; far above the number of tasks a
+# validator runs concurrently against one miner.
+_MAX_TRACKED_TASKS = 10_000
+
+# Module-level process-local state keyed by task_id (LRU order).
+_TASK_STATE: OrderedDict[str, dict] = OrderedDict()
+
+# Formatted history lines per task_id, with the number of entries they cover
+# and the last of those entries, so each step only formats the entries
+# appended since the last one.
+_HISTORY_CACHE: OrderedDict[str, tuple[int, dict, list[str]]] = OrderedDict()
+
+# Parsed page per task_id, reused while the snapshot HTML is unchanged
+# between steps. Entries keep the snapshot string itself so a hit is an
+# exact match, never a hash collision. They also hold a BeautifulSoup
+# tree, so far fewer are kept.
+_MAX_CACHED_PAGES = 64
+_PAGE_CACHE: OrderedDict[str, tuple[str, dict]] = OrderedDict()
 
-# Module-level process-local state keyed by task_id.
-_TASK_STATE: dict[str, dict] = {}
+
+def _lru_get(store: OrderedDict, task_id: str):
+    """Return *store*[task_id] (or ``None``), marking it most recently used."""
+    value = store.get(task_id)
+    if value is not None:
+        store.move_to_end(task_id)
+    return value
+
+
+def _lru_set(
+    store: OrderedDict, task_id: str, value, maxsize: int | None = None
+) -> None:
+    """Insert *value* for *task_id*, evicting the oldest task when full.
+
+    *maxsize* defaults to ``_MAX_TRACKED_TASKS``, read at call time.
+    """
+    store[task_id] = value
+    store.move_to_end(task_id)
+    if len(store) > (_MAX_TRACKED_TASKS if maxsize is None else maxsize):
+        store.popitem(last=False)
+
+
+def _get_task_state(task_id: str) -> dict:
+    """Return the state dict for *task_id*, creating it on first use."""
+    state = _lru_get(_TASK_STATE, task_id)
+    if state is None:
+        state = {
+            "last_sig": None,
+            "last_url": None,
+            "repeat_count": 0,
+            # Running action counts over the history entries seen so far,
+            # and the last entry counted (to spot a replaced history).
+            "history_len": 0,
+            "history_last": None,
+            "type_count": 0,
+            "saw_click": False,
+        }
+        _lru_set(_TASK_STATE, task_id, state)
+    return state
 
 
 def get_action_signature(decision: dict) -> str:
@@ -37,22 +99,9 @@ def check_loop(task_id: str, url: str, action_sig: str) -> str | None:
     returns a course-correction hint string. Otherwise returns ``None``.
     The repeat counter resets when the action_sig or url changes.
     """
-    if task_id not in _TASK_STATE:
-        _TASK_STATE[task_id] = {
-            "last_sig": None,
-            "last_url": None,
-            "repeat_count": 0,
-        }
-
-    state = _TASK_STATE[task_id]
-    combo = f"{action_sig}@{url}"
-    last_combo = (
-        f"{state['last_sig']}@{state['last_url']}"
-        if state["last_sig"] is not None
-        else None
-    )
-
-    if combo == last_combo:
+    state = _get_task_state(task_id)
+    # last_sig starts as None, which never equals a real signature.
+    if (action_sig, url) == (state["last_sig"], state["last_url"]):
         state["repeat_count"] += 1
     else:
         state["last_sig"] = action_sig
@@ -64,6 +113,67 @@ def check_loop(task_id: str, url: str, action_sig: str) -> str | None:
     return None
 
 
+def count_history_actions(task_id: str, history: list[dict]) -> tuple[int, bool]:
+    """Return ``(type_count, saw_click)`` over *history* for a task.
+
+    Counts are kept in the task state and only the entries appended since
+    the previous call are scanned. A history that is shorter than the one
+    already counted, or no longer holds the last counted entry at the same
+    position, is treated as a new sequence and recounted from the start.
+    """
+    state = _get_task_state(task_id)
+    start = state["history_len"]
+    if start and (
+        len(history) < start or history[start - 1] != state["history_last"]
+    ):
+        start = 0
+        state["type_count"] = 0
+        state["saw_click"] = False
+
+    for entry in history[start:]:
+        action = entry.get("action", "")  # exact match, not substring
+        if action == "type":
+            state["type_count"] += 1
+        elif action == "click":
+            state["saw_click"] = True
+
+    state["history_len"] = len(history)
+    state["history_last"] = history[-1] if history else None
+    return state["type_count"], state["saw_click"]
+
+
+def get_history_cache(task_id: str) -> tuple[int, dict, list[str]] | None:
+    """Return ``(count, last_entry, lines)`` cached for a task, or ``None``."""
+    return _lru_get(_HISTORY_CACHE, task_id)
+
+
+def set_history_cache(
+    task_id: str, count: int, last_entry: dict, lines: list[str]
+) -> None:
+    """Store *lines* formatted from a history of *count* entries.
+
+    *last_entry* is the final entry of that history, used to check that a
+    later history still extends it.
+    """
+    _lru_set(_HISTORY_CACHE, task_id, (count, last_entry, lines))
+
+
+def get_page_cache(task_id: str, html: str) -> dict | None:
+    """Return the page cached for a task if it was parsed from *html*."""
+    cached = _lru_get(_PAGE_CACHE, task_id)
+    # str equality checks identity and length before comparing contents.
+    if cached is None or cached[0] != html:
+        return None
+    return cached[1]
+
+
+def set_page_cache(task_id: str, html: str, page: dict) -> None:
+    """Store the parsed *page* for a task's snapshot *html*."""
+    _lru_set(_PAGE_CACHE, task_id, (html, page), _MAX_CACHED_PAGES)
+
+
 def clear_task_state(task_id: str) -> None:
-    """Remove a task from the state dict (cleanup after done or error)."""
+    """Remove a task from the state dicts (cleanup after done or error)."""
     _TASK_STATE.pop(task_id, None)
+    _HISTORY_CACHE.pop(task_id, None)
+    _PAGE_CACHE.pop(task_id, None)
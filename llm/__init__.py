@@ -1,6 +1,21 @@
 """LLM gateway client and JSON response parser."""
 
-from llm.client import LLMClient
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 from llm.parser import parse_llm_json
 
+if TYPE_CHECKING:
+    from llm.client import LLMClient
+
 __all__ = ["LLMClient", "parse_llm_json"]
+
+
+def __getattr__(name: str):
+    # LLMClient pulls in httpx and tenacity; load it only when first asked for.
+    if name == "LLMClient":
+        from llm.client import LLMClient
+
+        return LLMClient
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,21 +1,39 @@
 """LLM gateway HTTP client with IWA-Task-ID header and retry logic.
 
 Sends requests to the OpenAI-compatible gateway inside the IWA validator
-sandbox. Uses httpx for HTTP and tenacity for retry-on-error.
+sandbox. Uses an httpx ``AsyncClient`` for HTTP and tenacity for
+retry-on-error, so the event loop serves other requests during the LLM
+round trip.
 """
 
 from __future__ import annotations
 
+import functools
+import json
+import logging
 import os
+from typing import Callable
 
 import httpx
+import orjson
 from tenacity import (
+    RetryCallState,
+    before_sleep_log,
     retry,
     retry_if_exception,
     stop_after_attempt,
-    wait_exponential,
+    wait_random_exponential,
 )
 
+logger = logging.getLogger("agent")
+
+# Jittered exponential backoff so concurrent retries after a 429 spread out
+# instead of hitting the gateway again in lock step.
+_jittered_wait = wait_random_exponential(multiplier=0.5, max=2.0)
+
+# Upper bound on an honored Retry-After; the /act step budget is short.
+_MAX_RETRY_AFTER = 5.0
+
 
 def _is_retryable(exc: BaseException) -> bool:
     """Return True for transient gateway errors that should be retried."""
@@ -26,12 +44,108 @@ def _is_retryable(exc: BaseException) -> bool:
     return False
 
 
+_JSON_DECODER = json.JSONDecoder()
+
+
+async def _read_stream(resp: httpx.Response) -> dict:
+    """Collect a streamed chat completion into a non-streamed response dict.
+
+    Reading stops at the first content delta after which the accumulated
+    text holds a complete JSON object starting at its first ``{``, since a
+    decision is a single object and anything the model emits after it is
+    discarded by the parser anyway. Starting at the first brace lets a
+    markdown fence or short preamble close the stream early too; the
+    collected text still goes through ``parse_llm_json``. ``usage`` is only
+    present when the stream ran to its final chunk; it is ``{}`` when
+    reading stopped early.
+    """
+    content = ""
+    usage: dict = {}
+    async for line in resp.aiter_lines():
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            break
+        chunk = orjson.loads(data)
+        if chunk.get("usage"):
+            usage = chunk["usage"]
+        choices = chunk.get("choices") or []
+        delta = (choices[0].get("delta") or {}).get("content") if choices else None
+        if not delta:
+            continue
+        content += delta
+        start = content.find("{") if "}" in delta else -1
+        if start >= 0:
+            try:
+                _JSON_DECODER.raw_decode(content, start)
+            except ValueError:
+                continue
+            break
+    return {
+        "choices": [{"message": {"role": "assistant", "content": content}}],
+        "usage": usage,
+    }
+
+
+def _retry_after_seconds(response: httpx.Response) -> float | None:
+    """Return a numeric ``Retry-After`` header in seconds, if present."""
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None  # HTTP-date form -- fall back to the jittered wait
+
+
+def _wait_for_retry(retry_state: RetryCallState) -> float:
+    """Jittered backoff, stretched to the gateway's ``Retry-After`` on 429."""
+    wait = _jittered_wait(retry_state)
+    exc = retry_state.outcome.exception() if retry_state.outcome else None
+    if isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code == 429:
+        retry_after = _retry_after_seconds(exc.response)
+        if retry_after is not None:
+            wait = max(wait, min(retry_after, _MAX_RETRY_AFTER))
+    return wait
+
+
+@functools.lru_cache(maxsize=16)
+def _body_builder(model: str) -> Callable[[list[dict], int, float], dict]:
+    """Return a request-body builder specialized for *model*.
+
+    The model-family branch is resolved once per model name rather than on
+    every call.
+    """
+    # GPT-5.x uses max_completion_tokens and does not accept temperature.
+    if model.startswith("gpt-5"):
+        def build(messages: list[dict], max_tokens: int, temperature: float) -> dict:
+            return {
+                "model": model,
+                "messages": messages,
+                "max_completion_tokens": max_tokens,
+            }
+    else:
+        def build(messages: list[dict], max_tokens: int, temperature: float) -> dict:
+            return {
+                "model": model,
+                "messages": messages,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+            }
+    return build
+
+
 class LLMClient:
-    """Synchronous client for the OpenAI-compatible LLM gateway.
+    """Async client for the OpenAI-compatible LLM gateway.
 
     Reads ``OPENAI_BASE_URL`` and ``OPENAI_API_KEY`` from the environment.
     Sends the mandatory ``IWA-Task-ID`` header on every request and retries
-    on 429 / 5xx errors with exponential backoff.
+    on 429 / 5xx errors with jittered exponential backoff, honoring
+    ``Retry-After`` on 429.
+
+    Setting ``LLM_STREAM=1`` streams completions and stops reading as soon
+    as the content holds a complete JSON object (see ``_read_stream``).
     """
 
     def __init__(self, timeout: float = 20.0) -> None:
@@ -39,8 +153,23 @@ class LLMClient:
             "OPENAI_BASE_URL", "https://api.openai.com/v1"
         ).rstrip("/")
         self.api_key: str = os.getenv("OPENAI_API_KEY", "")
+        self.stream: bool = os.getenv("LLM_STREAM", "") == "1"
         self.timeout = timeout
-        self._client: httpx.Client = httpx.Client(timeout=self.timeout)
+        # Headers shared by every request; only IWA-Task-ID varies per call.
+        self._static_headers: dict[str, str] = {"Content-Type": "application/json"}
+        if self.api_key:
+            self._static_headers["Authorization"] = f"Bearer {self.api_key}"
+        # One long-lived keep-alive pool: decide() reuses a single client
+        # (agent.loop._get_llm_client), so warm connections to the gateway
+        # skip the TCP+TLS handshake on every call.
+        self._client: httpx.AsyncClient = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_keepalive_connections=20,
+                max_connections=100,
+                keepalive_expiry=30.0,
+            ),
+        )
 
     # ------------------------------------------------------------------
     # Chat completions
@@ -48,10 +177,11 @@ class LLMClient:
 
     @retry(
         stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=0.5, min=0.5, max=2.0),
+        wait=_wait_for_retry,
         retry=retry_if_exception(_is_retryable),
+        before_sleep=before_sleep_log(logger, logging.WARNING),
     )
-    def chat_completions(
+    async def chat_completions(
         self,
         *,
         task_id: str,
@@ -59,6 +189,7 @@ class LLMClient:
         model: str = "gpt-5.2",
         temperature: float = 0.2,
         max_tokens: int = 300,
+        stream: bool | None = None,
     ) -> dict:
         """Send a chat-completions request to the LLM gateway.
 
@@ -68,42 +199,46 @@ class LLMClient:
             model: Model name (default ``gpt-5.2``).
             temperature: Sampling temperature (ignored for GPT-5.x).
             max_tokens: Maximum tokens in the completion.
+            stream: Stream the completion; defaults to ``LLM_STREAM``.
 
         Returns:
-            The parsed JSON response dict from the gateway.
+            The parsed JSON response dict from the gateway. Streamed
+            responses are reassembled into the same shape.
 
         Raises:
             httpx.HTTPStatusError: On non-retryable HTTP errors.
         """
-        headers: dict[str, str] = {
-            "Content-Type": "application/json",
-            "IWA-Task-ID": task_id,
-        }
-        if self.api_key:
-            headers["Authorization"] = f"Bearer {self.api_key}"
-
-        body: dict = {"model": model, "messages": messages}
-
-        # GPT-5.x uses max_completion_tokens and does not accept temperature.
-        if model.startswith("gpt-5"):
-            body["max_completion_tokens"] = max_tokens
-        else:
-            body["temperature"] = temperature
-            body["max_tokens"] = max_tokens
-
-        resp = self._client.post(
+        headers = {**self._static_headers, "IWA-Task-ID": task_id}
+
+        body = _body_builder(model)(messages, max_tokens, temperature)
+
+        if stream is None:
+            stream = self.stream
+        if stream:
+            body["stream"] = True
+            body["stream_options"] = {"include_usage": True}
+            async with self._client.stream(
+                "POST",
+                f"{self.base_url}/chat/completions",
+                json=body,
+                headers=headers,
+            ) as resp:
+                resp.raise_for_status()
+                return await _read_stream(resp)
+
+        resp = await self._client.post(
             f"{self.base_url}/chat/completions",
             json=body,
             headers=headers,
         )
         resp.raise_for_status()
-        return resp.json()
+        return orjson.loads(resp.content)
 
     # ------------------------------------------------------------------
     # Lifecycle
     # ------------------------------------------------------------------
 
-    def close(self) -> None:
+    async def close(self) -> None:
         """Close the underlying HTTP connection pool."""
         if self._client is not None:
-            self._client.close()
+            await self._client.aclose()
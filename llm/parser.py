@@ -1,27 +1,62 @@
 """Robust JSON parsing for LLM response text.
 
 Handles markdown code fences, preamble text, and trailing commentary
-that LLMs commonly add around JSON output. Optionally validates and
-coerces the parsed dict via a Pydantic model.
+that LLMs commonly add around JSON output. Also validates and coerces
+the parsed dict to the ``LLMDecision`` shape.
 """
 
 from __future__ import annotations
 
-import json
+import re
 from typing import Any
 
-from pydantic import ValidationError
+import orjson
 
-from models.decision import LLMDecision
+
+# Characters that matter when matching braces: braces, string delimiters
+# and the escape character. Everything in between is skipped in C.
+_JSON_STRUCTURE_RE = re.compile(r'[{}"\\]')
+
+
+def _object_end(text: str, start: int) -> int | None:
+    """Return the index just past the ``}`` closing the object at *start*.
+
+    Tracks brace depth outside string literals (honoring backslash
+    escapes). Returns ``None`` when the object is never closed.
+    """
+    depth = 0
+    in_string = False
+    escaped_pos = -1  # position of the character after a backslash
+    for m in _JSON_STRUCTURE_RE.finditer(text, start):
+        pos = m.start()
+        if pos == escaped_pos:
+            continue
+        ch = m.group()
+        if in_string:
+            if ch == "\\":
+                escaped_pos = pos + 1
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+    return None
 
 
 def parse_llm_json(content: str) -> dict:
     """Parse a JSON dict from LLM response text.
 
-    Three-phase approach:
-      1. Fast path -- try ``json.loads`` directly.
-      2. Fence stripping -- remove markdown ```json / ``` wrappers.
-      3. Object extraction -- find first ``{`` and last ``}``.
+    Two-phase approach:
+      1. Fast path -- try ``orjson.loads`` directly.
+      2. Object extraction -- brace-match the outermost object starting at
+         the first ``{`` and parse just that span. This covers markdown
+         ```json fences, preamble text and trailing commentary in one
+         scan; if that span is not valid JSON, the next ``{`` is tried.
 
     Returns:
         A Python dict parsed from the JSON content.
@@ -35,54 +70,62 @@ def parse_llm_json(content: str) -> dict:
 
     # --- Fast path: pure JSON ---
     try:
-        obj = json.loads(raw)
+        obj = orjson.loads(raw)
         if isinstance(obj, dict):
             return obj
-    except (json.JSONDecodeError, ValueError):
+    except orjson.JSONDecodeError:
         pass
 
-    # --- Fence stripping ---
-    s = raw
-    if s.startswith("```"):
-        if s.startswith("```json"):
-            s = s[7:]
-        else:
-            s = s[3:]
-        if s.endswith("```"):
-            s = s[:-3]
-        s = s.strip()
-        try:
-            obj = json.loads(s)
-            if isinstance(obj, dict):
-                return obj
-        except (json.JSONDecodeError, ValueError):
-            pass
-
-    # --- Object extraction: first { to last } ---
+    # --- Object extraction: outermost {...} by brace depth ---
     start = raw.find("{")
-    end = raw.rfind("}")
-    if 0 <= start < end:
+    while start >= 0:
+        end = _object_end(raw, start)
+        if end is None:
+            break
         try:
-            obj = json.loads(raw[start : end + 1])
-            if isinstance(obj, dict):
-                return obj
-        except (json.JSONDecodeError, ValueError):
-            pass
+            return orjson.loads(raw[start:end])
+        except orjson.JSONDecodeError:
+            start = raw.find("{", start + 1)
 
     raise ValueError(f"LLM returned non-JSON: {raw[:200]}")
 
 
+def _coerce_candidate_id(value: Any) -> int | None:
+    """Coerce a candidate_id to int; unparseable values become ``None``."""
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return None
+
+
 def normalize_decision(raw: dict[str, Any]) -> dict[str, Any] | None:
     """Validate and coerce the parsed LLM decision dict.
 
     Ensures required 'action' is present and coerces candidate_id to int.
     Ignores extra keys. Returns a dict suitable for build_action, or None
     on validation failure (caller should use fallback without retrying LLM).
+
+    Applies the rules of ``models.decision.LLMDecision`` directly instead
+    of a model_validate/model_dump round trip: ``action`` must be a str,
+    ``text``/``url`` must be str or absent, and a bad candidate_id is
+    dropped rather than rejecting the decision.
     """
     if not isinstance(raw, dict) or "action" not in raw:
         return None
-    try:
-        decision = LLMDecision.model_validate(raw)
-        return decision.model_dump(exclude_none=False)
-    except ValidationError:
+    action = raw["action"]
+    text = raw.get("text")
+    url = raw.get("url")
+    if not isinstance(action, str):
+        return None
+    if (text is not None and not isinstance(text, str)) or (
+        url is not None and not isinstance(url, str)
+    ):
         return None
+    return {
+        "action": action,
+        "candidate_id": _coerce_candidate_id(raw.get("candidate_id")),
+        "text": text,
+        "url": url,
+    }
@@ -3,19 +3,22 @@
 Exports ``app`` for use with ``uvicorn main:app``.
 """
 
-import json
 import logging
-import traceback
+import queue
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
+import orjson
 from dotenv import load_dotenv
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 # Load .env from miner directory so OPENAI_API_KEY / OPENAI_BASE_URL are set
 load_dotenv(Path(__file__).resolve().parent / ".env")
 
-from agent.loop import decide
+from agent.loop import close_llm_client, decide
 from models.request import ActRequest
 from models.response import ActResponse
 
@@ -41,14 +44,34 @@ class StructuredFormatter(logging.Formatter):
                 log_data[key] = val
         if record.exc_info and record.exc_info[0] is not None:
             log_data["exception"] = self.formatException(record.exc_info)
-        return json.dumps(log_data)
+        return orjson.dumps(log_data).decode()
 
 
 _handler = logging.StreamHandler()
 _handler.setFormatter(StructuredFormatter())
 
+
+class _RecordQueueHandler(QueueHandler):
+    """Queue records with their args merged but otherwise unformatted.
+
+    The stock ``prepare`` formats the record on the calling thread and
+    drops ``exc_info``; here JSON formatting (and the traceback) is left
+    to ``StructuredFormatter`` on the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+# Request handlers only enqueue records; a listener thread formats and
+# writes them (started/stopped by the app lifespan).
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, _handler)
+
 logger = logging.getLogger("agent")
-logger.addHandler(_handler)
+logger.addHandler(_RecordQueueHandler(_log_queue))
 logger.setLevel(logging.INFO)
 # Prevent propagation to root logger to avoid duplicate output
 logger.propagate = False
@@ -58,7 +81,18 @@ logger.propagate = False
 # FastAPI application
 # ---------------------------------------------------------------------------
 
-app = FastAPI(title="Autoppia Web Agent")
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Run the log listener; close it and the LLM connection pool on shutdown."""
+    _log_listener.start()
+    try:
+        yield
+    finally:
+        await close_llm_client()
+        _log_listener.stop()
+
+
+app = FastAPI(title="Autoppia Web Agent", lifespan=lifespan)
 
 
 # ---------------------------------------------------------------------------
@@ -71,11 +105,13 @@ SAFE_FALLBACK_RESPONSE = {"actions": [{"type": "ScrollAction", "down": True}]}
 @app.exception_handler(Exception)
 async def catch_all_handler(request: Request, exc: Exception) -> JSONResponse:
     """Catch all unhandled exceptions and return a safe ScrollAction fallback."""
+    # The traceback is formatted by StructuredFormatter into the
+    # "exception" field, off the request path (see _RecordQueueHandler).
     logger.error(
-        "Unhandled exception: %s: %s\n%s",
+        "Unhandled exception: %s: %s",
         type(exc).__name__,
         exc,
-        traceback.format_exc(),
+        exc_info=exc,
     )
     return JSONResponse(status_code=200, content=SAFE_FALLBACK_RESPONSE)
 
@@ -84,18 +120,29 @@ async def catch_all_handler(request: Request, exc: Exception) -> JSONResponse:
 # Endpoints
 # ---------------------------------------------------------------------------
 
+# Prebuilt once: the body never changes, and a Response holds no
+# per-request state, so the same object is sent on every call.
+_HEALTH_RESPONSE = Response(
+    content=b'{"status":"healthy"}', media_type="application/json"
+)
+
+
 @app.get("/health")
-async def health() -> dict:
+async def health() -> Response:
     """Health check -- must respond instantly (20s sandbox timeout)."""
-    return {"status": "healthy"}
+    return _HEALTH_RESPONSE
 
 
 @app.post("/act", response_model=ActResponse)
-async def act(request: ActRequest) -> ActResponse:
+async def act(request: ActRequest) -> Response:
     """Handle an IWA act request.
 
     Delegates to the agent decision loop which parses the page HTML,
     calls the LLM for action decisions, and returns typed IWA actions.
+
+    The ``ActResponse`` is already validated on construction, so it is
+    serialized directly; returning a ``Response`` skips FastAPI's second
+    dump-and-validate pass. ``response_model`` is kept for the schema.
     """
     logger.info(
         "act request",
@@ -106,7 +153,7 @@ async def act(request: ActRequest) -> ActResponse:
         },
     )
 
-    response = decide(request)
+    response = await decide(request)
 
     action_type = (
         type(response.actions[0]).__name__ if response.actions else "done"
@@ -116,4 +163,6 @@ async def act(request: ActRequest) -> ActResponse:
         extra={"action_type": action_type},
     )
 
-    return response
+    return Response(
+        content=response.model_dump_json(), media_type="application/json"
+    )
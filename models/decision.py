@@ -1,6 +1,8 @@
 """Pydantic model for LLM decision output validation and coercion.
 
-Used after parse_llm_json to validate and coerce types (e.g. candidate_id to int).
+Defines the decision schema. ``llm.parser.normalize_decision`` applies the
+same rules by hand on the request path, so this model is the reference for
+that function rather than something called once per LLM response.
 On validation failure, the pipeline falls back to a safe action without retrying the LLM.
 """
 
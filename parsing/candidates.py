@@ -7,9 +7,11 @@ instances for downstream LLM consumption.
 
 from __future__ import annotations
 
+import re
 from dataclasses import dataclass, field
 
-from bs4 import BeautifulSoup
+import soupsieve
+from bs4 import BeautifulSoup, Tag
 
 from parsing.filtering import is_disabled, is_hidden
 from parsing.labels import infer_label
@@ -25,10 +27,28 @@ INTERACTIVE_SELECTORS = [
     "[role='link']",
 ]
 
+# The selectors compiled once: the combined list finds every interactive
+# element in a single tree walk, the individual ones bucket each match.
+_INTERACTIVE_COMBINED = soupsieve.compile(", ".join(INTERACTIVE_SELECTORS))
+_INTERACTIVE_PATTERNS = [soupsieve.compile(sel) for sel in INTERACTIVE_SELECTORS]
 
-@dataclass
+_WS_RE = re.compile(r"\s+")
+
+# Tags whose surrounding card/row text is captured as Candidate.context.
+_CONTEXT_TAGS = frozenset({"a", "button"})
+# Container tags accepted by _pick_context_container, and where it stops.
+_CARD_TAGS = frozenset({"li", "tr", "article"})
+_CONTEXT_STOP_TAGS = frozenset({None, "body", "html", "[document]"})
+
+
+@dataclass(slots=True)
 class Candidate:
-    """An interactive element extracted from HTML."""
+    """An interactive element extracted from HTML.
+
+    Slotted: the detectors and the Page IR formatter read a handful of
+    fields per candidate on every step, and slot access avoids a per-instance
+    ``__dict__``.
+    """
 
     id: int
     tag: str
@@ -43,8 +63,17 @@ class Candidate:
     selected: bool = False
     disabled: bool = False
     current_value: str = ""
-    options: list[str] = field(default_factory=list)
+    options: tuple[str, ...] = ()  # shared empty default for non-selects
     context: str = ""
+    # Lowercased copies shared by every keyword detector (computed once).
+    label_lower: str = field(init=False, repr=False)
+    text_lower: str = field(init=False, repr=False)
+    placeholder_lower: str = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.label_lower = (self.label or "").lower()
+        self.text_lower = (self.text or "").lower()
+        self.placeholder_lower = (self.placeholder or "").lower()
 
 
 def _attrs_to_str_map(attrs: dict) -> dict[str, str]:
@@ -55,8 +84,10 @@ def _attrs_to_str_map(attrs: dict) -> dict[str, str]:
     """
     result: dict[str, str] = {}
     for k, v in attrs.items():
-        if isinstance(v, list):
-            result[k] = " ".join(str(item) for item in v)
+        if v.__class__ is str:  # common case: already a plain str
+            result[k] = v
+        elif isinstance(v, list):
+            result[k] = " ".join(map(str, v))
         else:
             result[k] = str(v)
     return result
@@ -73,44 +104,69 @@ def _get_parent_form(el) -> str | None:  # noqa: ANN001
     return form.get("id") or form.get("name") or None
 
 
-def _get_select_options(el) -> list[str]:  # noqa: ANN001
-    """For ``<select>`` elements, return a list of ``<option>`` text values."""
-    return [
-        opt.get_text(strip=True)
+def _get_select_options(el) -> tuple[str, ...]:  # noqa: ANN001
+    """For ``<select>`` elements, return the non-empty ``<option>`` texts."""
+    return tuple(
+        text
         for opt in el.find_all("option")
-        if opt.get_text(strip=True)
-    ]
+        if (text := opt.get_text(strip=True))
+    )
 
 
 def _norm_context_ws(s: str) -> str:
     """Collapse whitespace in context text."""
-    import re as _re
-    return _re.sub(r"\s+", " ", s).strip()
+    return _WS_RE.sub(" ", s).strip()
 
 
-def _pick_context_container(el) -> str:  # noqa: ANN001
+def _pick_context_container(el, text_cache: dict[int, str]) -> str:  # noqa: ANN001
     """Walk up the DOM (max 8 levels) to find a card-like container.
 
     Looks for ``li``, ``tr``, ``article``, or a ``div`` whose visible text
     is between 50 and 900 characters.  Returns the container's text
     truncated to 180 chars, or empty string if no suitable container found.
+
+    *text_cache* maps ``id(node)`` to its normalized text for the current
+    soup, so sibling links/buttons under the same ancestors flatten each
+    subtree only once. An ancestor's text is never shorter than its
+    descendant's, so the walk stops at the first node of 900+ chars.
     """
-    _CARD_TAGS = {"li", "tr", "article"}
     node = el.parent
     for _ in range(8):
-        if node is None or node.name in (None, "body", "html", "[document]"):
+        if node is None or node.name in _CONTEXT_STOP_TAGS:
             break
-        tag = node.name
-        text = _norm_context_ws(node.get_text(" ", strip=True))
+        key = id(node)
+        text = text_cache.get(key)
+        if text is None:
+            text = text_cache[key] = _norm_context_ws(node.get_text(" ", strip=True))
         text_len = len(text)
-        if tag in _CARD_TAGS and 20 < text_len < 900:
+        if text_len >= 900:
+            break
+        tag = node.name
+        if tag in _CARD_TAGS and 20 < text_len:
             return text[:180]
-        if tag == "div" and 50 < text_len < 900:
+        if tag == "div" and 50 < text_len:
             return text[:180]
         node = node.parent
     return ""
 
 
+def _select_interactive(soup: BeautifulSoup) -> list[Tag]:
+    """Return interactive elements grouped in ``INTERACTIVE_SELECTORS`` order.
+
+    Walks the tree once and files each element under the first selector it
+    matches, keeping document order within a group. This is the order of
+    running ``soup.select`` per selector, minus repeat matches of the same
+    element, which would only be dropped by signature dedup later.
+    """
+    groups: list[list[Tag]] = [[] for _ in _INTERACTIVE_PATTERNS]
+    for el in _INTERACTIVE_COMBINED.select(soup):
+        for group, pattern in zip(groups, _INTERACTIVE_PATTERNS):
+            if pattern.match(el):
+                group.append(el)
+                break
+    return [el for group in groups for el in group]
+
+
 def extract_candidates(
     html: str, *, soup: BeautifulSoup | None = None
 ) -> list[Candidate]:
@@ -134,54 +190,56 @@ def extract_candidates(
         soup = BeautifulSoup(html, "lxml")
     candidates: list[Candidate] = []
     seen_sigs: set[tuple[str, str, str]] = set()
-
-    for css_sel in INTERACTIVE_SELECTORS:
-        for el in soup.select(css_sel):
-            tag = el.name
-            attrs = _attrs_to_str_map(el.attrs)
-
-            # Skip input[type=hidden]
-            if tag == "input" and attrs.get("type", "").lower() == "hidden":
-                continue
-
-            # Skip hidden or disabled elements
-            if is_hidden(attrs) or is_disabled(attrs):
-                continue
-
-            # Infer label and build selector
-            label = infer_label(soup, el, attrs)
-            selector = build_selector(tag, attrs, text=label)
-
-            # Deduplicate by selector signature
-            sig = (
-                selector.get("type", ""),
-                selector.get("attribute", ""),
-                selector.get("value", ""),
-            )
-            if sig in seen_sigs:
-                continue
-            seen_sigs.add(sig)
-
-            # Build candidate with full context
-            context = ""
-            if tag in ("a", "button"):
-                context = _pick_context_container(el)
-
-            candidate = Candidate(
-                id=len(candidates),
-                tag=tag,
-                text=label,
-                selector=selector,
-                attrs=attrs,
-                label=label,
-                parent_form=_get_parent_form(el),
-                input_type=attrs.get("type", "") if tag == "input" else "",
-                placeholder=attrs.get("placeholder", ""),
-                checked="checked" in attrs,
-                current_value=attrs.get("value", ""),
-                options=_get_select_options(el) if tag == "select" else [],
-                context=context,
-            )
-            candidates.append(candidate)
+    context_text_cache: dict[int, str] = {}
+
+    for el in _select_interactive(soup):
+        tag = el.name
+        attrs = _attrs_to_str_map(el.attrs)
+
+        # Skip input[type=hidden]
+        if tag == "input" and attrs.get("type", "").lower() == "hidden":
+            continue
+
+        # Skip hidden or disabled elements
+        if is_hidden(attrs) or is_disabled(attrs):
+            continue
+
+        # Infer label and build selector
+        label = infer_label(soup, el, attrs)
+        selector = build_selector(tag, attrs, text=label)
+
+        # Deduplicate by selector signature
+        sig = (
+            selector.get("type", ""),
+            selector.get("attribute", ""),
+            selector.get("value", ""),
+        )
+        if sig in seen_sigs:
+            continue
+        seen_sigs.add(sig)
+
+        # Build candidate with full context
+        context = (
+            _pick_context_container(el, context_text_cache)
+            if tag in _CONTEXT_TAGS
+            else ""
+        )
+
+        candidate = Candidate(
+            id=len(candidates),
+            tag=tag,
+            text=label,
+            selector=selector,
+            attrs=attrs,
+            label=label,
+            parent_form=_get_parent_form(el),
+            input_type=attrs.get("type", "") if tag == "input" else "",
+            placeholder=attrs.get("placeholder", ""),
+            checked="checked" in attrs,
+            current_value=attrs.get("value", ""),
+            options=_get_select_options(el) if tag == "select" else (),
+            context=context,
+        )
+        candidates.append(candidate)
 
     return candidates
@@ -1,5 +1,11 @@
 """Hidden and disabled element detection for HTML candidate extraction."""
 
+import re
+
+# Matched against lowercased attribute values, one search per attribute.
+_HIDDEN_STYLE_RE = re.compile(r"display: ?none|visibility: ?hidden")
+_HIDDEN_CLASS_RE = re.compile(r"(?:^|\s)(?:hidden|sr-only|invisible)(?:\s|$)")
+
 
 def is_hidden(attrs: dict[str, str]) -> bool:
     """Check if an element should be excluded as hidden.
@@ -13,18 +19,18 @@ def is_hidden(attrs: dict[str, str]) -> bool:
     """
     if "hidden" in attrs:
         return True
-    if attrs.get("aria-hidden", "").lower() == "true":
+    aria_hidden = attrs.get("aria-hidden")
+    # Exact "true" first: skips lower()'s allocation for the usual spelling
+    if aria_hidden is not None and (
+        aria_hidden == "true" or aria_hidden.lower() == "true"
+    ):
         return True
-    style = attrs.get("style", "").lower()
-    if "display:none" in style or "display: none" in style:
+    style = attrs.get("style")
+    if style and _HIDDEN_STYLE_RE.search(style.lower()):
         return True
-    if "visibility:hidden" in style or "visibility: hidden" in style:
+    classes = attrs.get("class")
+    if classes and _HIDDEN_CLASS_RE.search(classes.lower()):
         return True
-    classes = attrs.get("class", "").lower()
-    hidden_tokens = {"hidden", "sr-only", "invisible"}
-    for token in classes.split():
-        if token in hidden_tokens:
-            return True
     return False
 
 
@@ -35,6 +41,9 @@ def is_disabled(attrs: dict[str, str]) -> bool:
     """
     if "disabled" in attrs:
         return True
-    if attrs.get("aria-disabled", "").lower() == "true":
+    aria_disabled = attrs.get("aria-disabled")
+    if aria_disabled is not None and (
+        aria_disabled == "true" or aria_disabled.lower() == "true"
+    ):
         return True
     return False
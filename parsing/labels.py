@@ -4,10 +4,12 @@ from __future__ import annotations
 
 import re
 
+_WS_RE = re.compile(r"\s+")
+
 
 def _norm_ws(s: str) -> str:
     """Collapse whitespace runs into a single space and strip."""
-    return re.sub(r"\s+", " ", (s or "")).strip()
+    return _WS_RE.sub(" ", s).strip() if s else ""
 
 
 def infer_label(soup, el, attrs: dict[str, str]) -> str:  # noqa: ANN001
@@ -16,16 +16,18 @@ character cap = ``max_tokens * 4 * 0.9``).
 
 from __future__ import annotations
 
-import copy
 from typing import TYPE_CHECKING
 
-from parsing.pruning import strip_presentation_attrs
-
 if TYPE_CHECKING:
     from bs4 import BeautifulSoup
 
     from parsing.candidates import Candidate
 
+# Heading levels listed under PAGE STRUCTURE.
+_HEADING_TAGS = frozenset({"h1", "h2", "h3"})
+# Tags whose element line gets a "-> context" suffix.
+_CONTEXT_SUFFIX_TAGS = frozenset({"a", "button"})
+
 
 # ---------------------------------------------------------------------------
 # Compact element formatting
@@ -45,32 +47,36 @@ def _format_candidate_compact(c: Candidate) -> str:
         [3] input[password] "Enter password" (name=password, form=loginForm)
         [5] select "Country" (name=country, options=[USA, Canada, UK])
     """
-    parts: list[str] = [f"[{c.id}]"]
+    # Fields read more than once are bound to locals up front.
+    tag = c.tag
+    attrs = c.attrs
+    selector = c.selector
+
+    # Fragments (separators included) joined once at the end
+    out: list[str] = ["[", str(c.id), "] ", tag]
 
     # Tag with input_type suffix for inputs
     if c.input_type:
-        parts.append(f"{c.tag}[{c.input_type}]")
-    else:
-        parts.append(c.tag)
+        out += ("[", c.input_type, "]")
 
     # Label (truncated to 60 chars)
     label = c.label or c.text
     if label:
-        parts.append(f'"{label[:60]}"')
+        out += (' "', label[:60], '"')
 
     # Parenthetical metadata (only present items, in order)
     meta: list[str] = []
 
     # Role and aria-label for disambiguation (crypto-style)
-    role = c.attrs.get("role", "")
+    role = attrs.get("role", "")
     if role:
         meta.append(f"role={role[:30]}")
-    aria_label = c.attrs.get("aria-label", "")
+    aria_label = attrs.get("aria-label", "")
     if aria_label:
         meta.append(f"aria-label={aria_label[:40]}")
 
-    sel_attr = c.selector.get("attribute", "")
-    sel_val = c.selector.get("value", "")
+    sel_attr = selector.get("attribute", "")
+    sel_val = selector.get("value", "")
     if sel_attr and sel_val and sel_attr != "custom":
         meta.append(f"{sel_attr}={sel_val[:40]}")
 
@@ -91,16 +97,16 @@ def _format_candidate_compact(c: Candidate) -> str:
         meta.append("disabled")
 
     if meta:
-        parts.append(f"({', '.join(meta)})")
+        out += (" (", ", ".join(meta), ")")
 
     # Context suffix for links/buttons — helps LLM distinguish repeated labels
-    if c.tag in ("a", "button") and c.context:
-        ctx = c.context
+    ctx = c.context
+    if ctx and tag in _CONTEXT_SUFFIX_TAGS:
         # Don't append if context is just the label repeated
-        if ctx.strip().lower() != (c.label or c.text or "").strip().lower():
-            parts.append(f'-> "{ctx[:120]}"')
+        if ctx.strip().lower() != (c.label_lower or c.text_lower).strip():
+            out += (' -> "', ctx[:120], '"')
 
-    return " ".join(parts)
+    return "".join(out)
 
 
 # ---------------------------------------------------------------------------
@@ -108,6 +114,22 @@ def _format_candidate_compact(c: Candidate) -> str:
 # ---------------------------------------------------------------------------
 
 
+def _bounded_text(soup: BeautifulSoup, limit: int) -> str:
+    """Return ``soup.get_text(" ", strip=True)[:limit]`` without the full text.
+
+    Stops pulling stripped strings once the joined text reaches *limit*
+    characters instead of concatenating the whole document first.
+    """
+    parts: list[str] = []
+    joined_len = -1  # no separator before the first string
+    for string in soup.stripped_strings:
+        parts.append(string)
+        joined_len += len(string) + 1
+        if joined_len >= limit:
+            break
+    return " ".join(parts)[:limit]
+
+
 def build_page_ir(
     soup: BeautifulSoup,
     url: str,
@@ -118,9 +140,9 @@ def build_page_ir(
 ) -> str:
     """Build a compact page intermediate representation under token budget.
 
-    Operates on a **copy** of *soup* so that the original (which may
-    still be needed for selector building) is not mutated by attribute
-    stripping.
+    Reads *soup* without mutating it. Only heading and body text are
+    rendered and no attributes are written, so the tree is used as-is
+    rather than copied and stripped of presentation attributes first.
 
     Args:
         soup: Pruned ``BeautifulSoup`` object (from ``prune_html()``).
@@ -134,39 +156,61 @@ def build_page_ir(
     """
     char_limit = int(max_tokens * 4 * 0.9)
 
-    # Work on a copy so the caller's soup is untouched
-    soup_copy = copy.copy(soup)
-    strip_presentation_attrs(soup_copy)
+    # Lines are kept in their truncation buckets from the start, with a
+    # running length of the joined text, so an oversized IR is cut without
+    # re-joining or re-classifying every line.
 
     # ---- Section 1: Page Context ----
-    lines: list[str] = [f"URL: {url}", f"TITLE: {title}", ""]
-
-    # Headings
-    lines.append("PAGE STRUCTURE:")
-    for h in soup_copy.find_all(["h1", "h2", "h3"]):
-        text = h.get_text(strip=True)[:80]
-        if text:
-            lines.append(f"  {h.name}: {text}")
+    # Plain concatenation for the fixed-prefix lines; no format specs needed.
+    header_lines: list[str] = ["URL: " + url, "TITLE: " + title]
+    # Joined length counts one newline per line, minus the last; the fixed
+    # lines are the two blank separators and both section headers.
+    running_len = (
+        len(header_lines[0]) + len(header_lines[1])
+        + len("PAGE STRUCTURE:") + len("INTERACTIVE ELEMENTS:") + 5
+    )
+
+    # Headings, in document order. Once they alone exceed the cap the IR
+    # is truncated, and _truncate_ir only keeps headings that fit within
+    # the cap, so the walk stops there without changing the output.
+    heading_lines: list[str] = []
+    heading_len = 0
+    for el in soup.descendants:
+        if el.name in _HEADING_TAGS:  # strings have name None
+            text = el.get_text(strip=True)[:80]
+            if text:
+                line = "  " + el.name + ": " + text
+                heading_lines.append(line)
+                heading_len += len(line) + 1
+                if heading_len > char_limit:
+                    break
+    running_len += heading_len
 
     # Body visible text summary (kept short for quick solving)
-    body_text = soup_copy.get_text(" ", strip=True)[:350]
+    body_text = _bounded_text(soup, 350)
+    text_line: str | None = None
     if body_text:
-        lines.append(f"TEXT: {body_text}")
-
-    lines.append("")
+        text_line = "TEXT: " + body_text
+        running_len += len(text_line) + 1
 
     # ---- Section 2: Interactive Elements ----
-    lines.append("INTERACTIVE ELEMENTS:")
-    for c in candidates:
-        lines.append(_format_candidate_compact(c))
-
-    ir_text = "\n".join(lines)
+    # Formatted and measured in bulk rather than line by line.
+    element_lines = [_format_candidate_compact(c) for c in candidates]
+    running_len += sum(map(len, element_lines)) + len(element_lines)
 
     # Enforce token cap
-    if len(ir_text) > char_limit:
-        ir_text = _truncate_ir(lines, candidates, char_limit)
-
-    return ir_text
+    if running_len > char_limit:
+        return _truncate_ir(
+            header_lines, heading_lines, text_line, element_lines, char_limit
+        )
+
+    lines = [*header_lines, "", "PAGE STRUCTURE:", *heading_lines]
+    if text_line:
+        lines.append(text_line)
+    lines.append("")
+    lines.append("INTERACTIVE ELEMENTS:")
+    lines.extend(element_lines)
+    return "\n".join(lines)
 
 
 # ---------------------------------------------------------------------------
@@ -175,12 +219,17 @@ def build_page_ir(
 
 
 def _truncate_ir(
-    lines: list[str],
-    candidates: list[Candidate],
+    header_lines: list[str],
+    heading_lines: list[str],
+    text_line: str | None,
+    element_lines: list[str],
     char_limit: int,
 ) -> str:
     """Truncate the Page IR to fit within *char_limit*.
 
+    Takes the IR lines already split by ``build_page_ir`` into header
+    (URL, TITLE), heading, body text and element buckets.
+
     Truncation priority (keep first, cut last):
 
     - **ALWAYS keep:** URL, TITLE lines
@@ -191,22 +240,6 @@ def _truncate_ir(
     - **CUT LAST:** interactive element lines (starting from end of list),
       appending a ``"... (N more elements truncated)"`` notice.
     """
-    # Separate lines into buckets
-    header_lines: list[str] = []   # URL, TITLE
-    heading_lines: list[str] = []  # "  h1: ...", "  h2: ...", etc.
-    text_line: str | None = None   # "TEXT: ..."
-    element_lines: list[str] = []  # "[N] tag ..."
-
-    for line in lines:
-        if line.startswith("URL:") or line.startswith("TITLE:"):
-            header_lines.append(line)
-        elif line.startswith("  h") and ":" in line[:8]:
-            heading_lines.append(line)
-        elif line.startswith("TEXT:"):
-            text_line = line
-        elif line.startswith("["):
-            element_lines.append(line)
-
     # Build result: always start with URL + TITLE
     result: list[str] = list(header_lines)
     result.append("")
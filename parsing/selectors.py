@@ -8,39 +8,68 @@ Never uses CSS class-based selectors (Tailwind breaks Playwright).
 
 from __future__ import annotations
 
-from models.selectors import sel_attr, sel_text
+from typing import Callable
 
 
-def build_selector(tag: str, attrs: dict[str, str], text: str = "") -> dict:
-    """Build the best IWA-compatible selector for an element.
+# ---------------------------------------------------------------------------
+# Selector dicts
+# ---------------------------------------------------------------------------
+# Built as literals with the exact shape of ``sel_attr(...).model_dump()`` and
+# ``sel_text(...).model_dump()`` from ``models.selectors``, skipping model
+# validation on a path that runs once per element. Keep them in sync.
 
-    Returns a dict suitable for inclusion in an IWA action payload.
-    """
-    if attrs.get("id"):
-        return sel_attr("id", attrs["id"]).model_dump()
 
-    if attrs.get("data-testid"):
-        return sel_attr("data-testid", attrs["data-testid"]).model_dump()
+def _attr_dict(attribute: str, value: str) -> dict:
+    """``attributeValueSelector`` dict for *attribute* = *value*."""
+    return {
+        "type": "attributeValueSelector",
+        "attribute": attribute,
+        "value": value,
+        "case_sensitive": False,
+    }
+
+
+def _text_dict(value: str) -> dict:
+    """``tagContainsSelector`` dict matching elements containing *value*."""
+    return {"type": "tagContainsSelector", "value": value, "case_sensitive": False}
+
 
-    if tag == "a" and attrs.get("href"):
-        href = attrs["href"]
-        if not href.lower().startswith("javascript:"):
-            return sel_attr("href", href).model_dump()
+# ---------------------------------------------------------------------------
+# Priority chain
+# ---------------------------------------------------------------------------
 
-    if attrs.get("aria-label"):
-        return sel_attr("aria-label", attrs["aria-label"]).model_dump()
 
-    if attrs.get("name"):
-        return sel_attr("name", attrs["name"]).model_dump()
+def _is_usable_href(tag: str, href: str) -> bool:
+    """Only links are selected by href, and never by a ``javascript:`` URL."""
+    # Only the 11-char scheme prefix is lowercased, not the whole URL.
+    return tag == "a" and href[:11].lower() != "javascript:"
 
-    if attrs.get("placeholder"):
-        return sel_attr("placeholder", attrs["placeholder"]).model_dump()
 
-    if attrs.get("title"):
-        return sel_attr("title", attrs["title"]).model_dump()
+# (attribute, predicate) in priority order. The first attribute with a
+# non-empty value that passes its predicate (if any) becomes the selector.
+_SELECTOR_CHAIN: tuple[tuple[str, Callable[[str, str], bool] | None], ...] = (
+    ("id", None),
+    ("data-testid", None),
+    ("href", _is_usable_href),
+    ("aria-label", None),
+    ("name", None),
+    ("placeholder", None),
+    ("title", None),
+)
+
+
+def build_selector(tag: str, attrs: dict[str, str], text: str = "") -> dict:
+    """Build the best IWA-compatible selector for an element.
+
+    Returns a dict suitable for inclusion in an IWA action payload.
+    """
+    for attr, predicate in _SELECTOR_CHAIN:
+        value = attrs.get(attr)
+        if value and (predicate is None or predicate(tag, value)):
+            return _attr_dict(attr, value)
 
     if text and tag in {"button", "a"}:
-        return sel_text(text).model_dump()
+        return _text_dict(text)
 
     # Last resort: tag-only custom selector
-    return sel_attr("custom", tag).model_dump()
+    return _attr_dict("custom", tag)
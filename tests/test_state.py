@@ -0,0 +1,85 @@
+"""Tests for the bounded LRU stores in ``agent.state``."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+
+import pytest
+
+from agent import state
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture(autouse=True)
+def _small_stores(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Give each test empty stores capped at three tasks / two pages."""
+    monkeypatch.setattr(state, "_MAX_TRACKED_TASKS", 3)
+    monkeypatch.setattr(state, "_MAX_CACHED_PAGES", 2)
+    monkeypatch.setattr(state, "_TASK_STATE", OrderedDict())
+    monkeypatch.setattr(state, "_HISTORY_CACHE", OrderedDict())
+    monkeypatch.setattr(state, "_PAGE_CACHE", OrderedDict())
+
+
+def test_task_state_evicts_least_recently_used() -> None:
+    for task_id in ("t0", "t1", "t2"):
+        state.check_loop(task_id, "http://localhost/", "click:0")
+
+    state.check_loop("t3", "http://localhost/", "click:0")
+
+    assert list(state._TASK_STATE) == ["t1", "t2", "t3"]
+
+
+def test_task_state_hit_refreshes_recency() -> None:
+    for task_id in ("t0", "t1", "t2"):
+        state.check_loop(task_id, "http://localhost/", "click:0")
+
+    # Touching t0 makes t1 the least recently used task.
+    state.check_loop("t0", "http://localhost/", "click:0")
+    state.check_loop("t3", "http://localhost/", "click:0")
+
+    assert "t0" in state._TASK_STATE
+    assert "t1" not in state._TASK_STATE
+    # The refreshed state kept its repeat count rather than starting over.
+    assert state._TASK_STATE["t0"]["repeat_count"] == 2
+
+
+def test_history_cache_evicts_least_recently_used() -> None:
+    entry = {"action": "click"}
+    for task_id in ("t0", "t1", "t2"):
+        state.set_history_cache(task_id, 1, entry, ["line"])
+
+    assert state.get_history_cache("t0") == (1, entry, ["line"])
+    state.set_history_cache("t3", 1, entry, ["line"])
+
+    assert state.get_history_cache("t1") is None
+    assert list(state._HISTORY_CACHE) == ["t2", "t0", "t3"]
+
+
+def test_page_cache_evicts_least_recently_used() -> None:
+    state.set_page_cache("t0", "<p>0</p>", {"page": 0})
+    state.set_page_cache("t1", "<p>1</p>", {"page": 1})
+
+    assert state.get_page_cache("t0", "<p>0</p>") == {"page": 0}
+    state.set_page_cache("t2", "<p>2</p>", {"page": 2})
+
+    assert state.get_page_cache("t1", "<p>1</p>") is None
+    assert list(state._PAGE_CACHE) == ["t0", "t2"]
+
+
+def test_page_cache_misses_on_changed_snapshot() -> None:
+    state.set_page_cache("t0", "<p>0</p>", {"page": 0})
+
+    assert state.get_page_cache("t0", "<p>changed</p>") is None
+
+
+def test_lru_get_refreshes_recency() -> None:
+    store: OrderedDict[str, int] = OrderedDict()
+    for i, task_id in enumerate(("a", "b", "c")):
+        state._lru_set(store, task_id, i)
+
+    assert state._lru_get(store, "a") == 0
+    state._lru_set(store, "d", 3)
+
+    assert list(store) == ["c", "a", "d"]
+    assert state._lru_get(store, "missing") is None